@@ -1,6 +1,6 @@
 import os
 import redis
-import json
+import orjson
 import logging
 from retrying import retry
 import certifi
@@ -37,7 +37,7 @@ def get_cache(key):
         cached_data = redis_client.get(key)
         if cached_data:
             logging.info(f"Cache hit for key: {key}")
-            return json.loads(cached_data)
+            return orjson.loads(cached_data)
         logging.info(f"Cache miss for key: {key}")
         return None
     except Exception as e:
@@ -51,19 +51,45 @@ def set_cache(key, value, expiry=3600):
         logging.warning("Redis client not initialized, skipping cache set")
         return
     try:
-        redis_client.setex(key, expiry, json.dumps(value))
+        redis_client.setex(key, expiry, orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS))
         logging.info(f"Cache set for key: {key} with expiry: {expiry} seconds")
     except Exception as e:
         logging.error(f"Error setting cache for key {key}: {str(e)}")
 
 @retry(stop_max_attempt_number=3, wait_fixed=2000)
-def delete_cache(key):
-    """Delete a key from Redis cache."""
+def get_cache_raw(key):
+    """Retrieve a pre-serialized JSON payload from Redis cache without decoding it."""
+    if redis_client is None:
+        logging.warning("Redis client not initialized, skipping cache")
+        return None
+    try:
+        cached_data = redis_client.get(key)
+        logging.info(f"Cache {'hit' if cached_data else 'miss'} for key: {key}")
+        return cached_data or None
+    except Exception as e:
+        logging.error(f"Error getting cache for key {key}: {str(e)}")
+        return None
+
+@retry(stop_max_attempt_number=3, wait_fixed=2000)
+def set_cache_raw(key, payload, expiry=3600):
+    """Store an already serialized JSON payload in Redis cache with an optional expiry time (in seconds)."""
+    if redis_client is None:
+        logging.warning("Redis client not initialized, skipping cache set")
+        return
+    try:
+        redis_client.setex(key, expiry, payload)
+        logging.info(f"Cache set for key: {key} with expiry: {expiry} seconds")
+    except Exception as e:
+        logging.error(f"Error setting cache for key {key}: {str(e)}")
+
+@retry(stop_max_attempt_number=3, wait_fixed=2000)
+def delete_cache(*keys):
+    """Delete one or more keys from Redis cache in a single round trip."""
     if redis_client is None:
         logging.warning("Redis client not initialized, skipping cache delete")
         return
     try:
-        redis_client.delete(key)
-        logging.info(f"Cache deleted for key: {key}")
+        redis_client.delete(*keys)
+        logging.info(f"Cache deleted for keys: {', '.join(keys)}")
     except Exception as e:
-        logging.error(f"Error deleting cache for key {key}: {str(e)}")
\ No newline at end of file
+        logging.error(f"Error deleting cache for keys {', '.join(keys)}: {str(e)}")
\ No newline at end of file
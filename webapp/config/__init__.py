@@ -1,3 +1,3 @@
-from .config import get_db_connection, close_db_connection
+from .config import get_db_connection, close_db_connection, db_connection, DB_POOL_MAX, DB_SESSION_STATE
 
-__all__ = ['get_db_connection', 'close_db_connection']
\ No newline at end of file
+__all__ = ['get_db_connection', 'close_db_connection', 'db_connection', 'DB_POOL_MAX', 'DB_SESSION_STATE']
\ No newline at end of file
@@ -4,6 +4,7 @@ import psycopg2
 from psycopg2 import pool
 import logging
 import time
+from contextlib import contextmanager
 
 # Load environment variables from .env file
 load_dotenv()
@@ -14,6 +15,17 @@ logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(
 # Initialize the connection pool (will be created once at app startup)
 db_pool = None
 
+# Pool bounds; keep DB_POOL_MAX under the database's connection limit
+DB_POOL_MIN = int(os.getenv('DB_POOL_MIN', 5))
+DB_POOL_MAX = int(os.getenv('DB_POOL_MAX', 32))
+
+DB_PORT = os.getenv('DB_PORT', '6543')  # Default to transaction mode (6543)
+# Supabase's transaction-mode pooler (6543) may run each transaction on a different server session,
+# so session state (startup options, prepared statements) is only relied on for session-mode ports
+DB_SESSION_STATE = DB_PORT != '6543'
+# Server-side cap on connections left idle inside an open transaction
+DB_IDLE_IN_TRANSACTION_TIMEOUT = os.getenv('DB_IDLE_IN_TRANSACTION_TIMEOUT', '60s')
+
 def init_db_pool():
     """Initialize the database connection pool."""
     global db_pool
@@ -24,10 +36,12 @@ def init_db_pool():
             f"dbname={os.getenv('DB_NAME')} "
             f"user={os.getenv('DB_USER')} "
             f"password={os.getenv('DB_PASSWORD')} "
-            f"port={os.getenv('DB_PORT', '6543')} "  # Default to transaction mode (6543)
+            f"port={DB_PORT} "
             f"sslmode=require "  # Enforce SSL for Supabase
             f"connect_timeout=10"
         )
+        if DB_SESSION_STATE:
+            connection_string += f" options='-c idle_in_transaction_session_timeout={DB_IDLE_IN_TRANSACTION_TIMEOUT}'"
 
         # Close existing pool if it exists
         if db_pool is not None:
@@ -37,9 +51,10 @@ def init_db_pool():
             except Exception as e:
                 logging.warning(f"Error closing existing pool: {str(e)}")
 
-        db_pool = psycopg2.pool.SimpleConnectionPool(
-            minconn=1,  # Minimum number of connections to keep open
-            maxconn=10,  # Increased to 10 to handle more concurrent requests
+        # Thread-safe pool shared by request handlers, scheduler jobs and scraper threads
+        db_pool = psycopg2.pool.ThreadedConnectionPool(
+            minconn=DB_POOL_MIN,
+            maxconn=DB_POOL_MAX,
             dsn=connection_string
         )
 
@@ -86,14 +101,17 @@ def get_db_connection(retries=3, delay=5):
                 db_pool = None
                 raise Exception("Unable to get database connection from pool after several attempts.")
 
-def close_db_connection(conn):
-    """Return the database connection to the pool."""
+def close_db_connection(conn, close=False):
+    """Return the database connection to the pool, discarding it instead when close is True."""
     if conn and db_pool:
         try:
             if conn.closed:
                 logging.warning("Connection is already closed, cannot return to pool.")
                 return
-            db_pool.putconn(conn)
+            if not close:
+                # Hand back a clean session: drop any transaction left open by the borrower
+                conn.rollback()
+            db_pool.putconn(conn, close=close)
             logging.info("Returned database connection to pool.")
             logging.debug(f"Connection pool status after return: used={db_pool._used}, total={db_pool.maxconn}")
         except Exception as e:
@@ -106,4 +124,14 @@ def close_db_connection(conn):
                 except Exception as reinit_e:
                     logging.error(f"Failed to reinitialize pool: {str(reinit_e)}")
     else:
-        logging.warning("No connection or pool to close.")
\ No newline at end of file
+        logging.warning("No connection or pool to close.")
+
+@contextmanager
+def db_connection():
+    """Borrow a pooled connection, committing on success and rolling back on error, then return it."""
+    conn = get_db_connection()
+    try:
+        with conn:
+            yield conn
+    finally:
+        close_db_connection(conn)
\ No newline at end of file
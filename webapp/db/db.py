@@ -234,6 +234,54 @@ def create_tables():
             conn.commit()
             logging.info("Tenders and relevant_keywords tables created or already exist.")
 
+            # Migrations on tables created elsewhere. Each runs in its own transaction and only when its
+            # table exists, so one failure is logged by name and does not undo the others.
+            migrations = (
+                # Store search engines as a native text[] so psycopg2 adapts Python lists directly
+                ("search_engines text[]", "scheduled_tasks", '''
+                    DO $$
+                    BEGIN
+                        IF EXISTS (
+                            SELECT 1 FROM information_schema.columns
+                            WHERE table_name = 'scheduled_tasks'
+                              AND column_name = 'search_engines'
+                              AND data_type <> 'ARRAY'
+                        ) THEN
+                            ALTER TABLE scheduled_tasks
+                                ALTER COLUMN search_engines TYPE text[]
+                                USING string_to_array(search_engines, ',');
+                        END IF;
+                    END
+                    $$
+                '''),
+                # Per-user task listings filter on user_id regardless of is_enabled
+                ("idx_scheduled_tasks_user_id", "scheduled_tasks",
+                 "CREATE INDEX IF NOT EXISTS idx_scheduled_tasks_user_id ON scheduled_tasks (user_id)"),
+                # Partial index backing the next-schedule lookup (enabled tasks ordered by start_time)
+                ("idx_sched_next", "scheduled_tasks", '''
+                    CREATE INDEX IF NOT EXISTS idx_sched_next
+                    ON scheduled_tasks (user_id, start_time)
+                    WHERE is_enabled = TRUE
+                '''),
+                # task_logs is an append-heavy audit trail; skip WAL for it and index the retention column.
+                # SET UNLOGGED fails if task_logs has a foreign key to or from a logged table.
+                ("task_logs unlogged", "task_logs", "ALTER TABLE task_logs SET UNLOGGED"),
+                ("idx_task_logs_created_at", "task_logs",
+                 "CREATE INDEX IF NOT EXISTS idx_task_logs_created_at ON task_logs (created_at)"),
+            )
+            for name, table, sql in migrations:
+                try:
+                    cur.execute("SELECT to_regclass(%s) IS NOT NULL", (table,))
+                    if not cur.fetchone()[0]:
+                        conn.rollback()
+                        logging.info("Skipping migration %s: table %s does not exist.", name, table)
+                        continue
+                    cur.execute(sql)
+                    conn.commit()
+                except Exception as e:
+                    conn.rollback()
+                    logging.error("Migration %s failed: %s", name, str(e))
+
     except Exception as e:
         logging.error("Error creating tables: %s", str(e))
 
@@ -1,6 +1,21 @@
 # webapp/extensions.py
+import orjson
 from flask_socketio import SocketIO
 from flask_jwt_extended import JWTManager
 
-socketio = SocketIO(cors_allowed_origins='*')  # Single instance, initialized later
-jwt = JWTManager()  # JWTManager instance
\ No newline at end of file
+
+class ORJSON:
+    """orjson-backed json module for Socket.IO packet encoding."""
+
+    @staticmethod
+    def dumps(obj, *args, **kwargs):
+        # Socket.IO passes stdlib-only kwargs such as separators; orjson output is already compact
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode()
+
+    @staticmethod
+    def loads(s, *args, **kwargs):
+        return orjson.loads(s)
+
+
+socketio = SocketIO(cors_allowed_origins='*', json=ORJSON)  # Single instance, initialized later
+jwt = JWTManager()  # JWTManager instance
@@ -217,12 +217,9 @@ def is_relevant_tender(text: str, db_connection) -> tuple[bool, list]:
 def insert_tender_to_db(tender_info, db_connection):
     try:
         cur = db_connection.cursor()
-        
-        # Check if the tender already exists based on source_url
-        cur.execute("SELECT 1 FROM tenders WHERE source_url = %s;", (tender_info['source_url'],))
-        exists = cur.fetchone() is not None
 
-        # Perform the insert or update
+        # Perform the insert or update; xmax is 0 only for a freshly inserted row,
+        # which tells us which branch ran without a separate existence check
         cur.execute("""
             INSERT INTO tenders (title, description, closing_date, source_url, status, scraped_at, format, tender_type, location)
             VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
@@ -234,7 +231,8 @@ def insert_tender_to_db(tender_info, db_connection):
                 scraped_at = EXCLUDED.scraped_at,
                 format = EXCLUDED.format,
                 tender_type = EXCLUDED.tender_type,
-                location = EXCLUDED.location;
+                location = EXCLUDED.location
+            RETURNING (xmax = 0) AS inserted;
         """, (
             tender_info['title'],
             tender_info['description'],
@@ -248,7 +246,7 @@ def insert_tender_to_db(tender_info, db_connection):
         ))
         
         # Log the action
-        action = "updated" if exists else "inserted"
+        action = "inserted" if cur.fetchone()[0] else "updated"
         ScrapingLog.add_log(f"Tender {action} in database: source_url={tender_info['source_url']}")
         
         db_connection.commit()
@@ -4,6 +4,7 @@ import base64
 from urllib.parse import urljoin, parse_qs, unquote, urlparse, quote
 from bs4 import BeautifulSoup
 import requests
+from requests.adapters import HTTPAdapter
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
@@ -19,6 +20,12 @@ from webapp.extensions import socketio
 from webapp.task_service.utils import set_task_state, get_task_state, delete_task_state
 from webapp.scrapers.constants import SEARCH_ENGINES, USER_AGENTS, EXCLUDED_DOMAINS, DISABLE_SELENIUM
 
+# Shared across scrapes so search and tender page fetches reuse keep-alive connections
+http_session = requests.Session()
+_http_adapter = HTTPAdapter(pool_connections=20, pool_maxsize=50, max_retries=3)
+http_session.mount('http://', _http_adapter)
+http_session.mount('https://', _http_adapter)
+
 def is_excluded_domains(url, excluded_domains):
     return any(domain in url for domain in excluded_domains)
 
@@ -48,7 +55,7 @@ def scrape_tender_details(url, title, headers, db_connection):
             return None, None
 
         try:
-            response = requests.get(page_url, headers=headers, timeout=5)
+            response = http_session.get(page_url, headers=headers, timeout=5)
             response.raise_for_status()
 
             if page_format == 'PDF':
@@ -151,7 +158,7 @@ def scrape_tender_details(url, title, headers, db_connection):
             ScrapingLog.add_log(f"========================================================\n")
             return None, "not_relevant"
 
-        response = requests.get(url, headers=headers, timeout=10)
+        response = http_session.get(url, headers=headers, timeout=10)
         description = extract_description_from_response(response, format_type)
         tender_info = {
             "title": title,
@@ -294,7 +301,7 @@ def scrape_tenders_from_query(db_connection, query, engines, task_id):
             if DISABLE_SELENIUM or prefer_requests:
                 if engine == "Yahoo":
                     try:
-                        response = requests.get(search_url, headers=headers, timeout=10)
+                        response = http_session.get(search_url, headers=headers, timeout=10)
                         html = response.text
                         soup = BeautifulSoup(html, 'html.parser')
                         link_elements = soup.select('div.dd.algo.algo-sr.relsrch h3.title a')
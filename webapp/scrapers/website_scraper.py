@@ -1,13 +1,30 @@
-from webapp.config import get_db_connection
+from webapp.config import DB_POOL_MAX, get_db_connection, close_db_connection, db_connection as pooled_connection
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 from webapp.services.log import ScrapingLog
 from webapp.scrapers.scraper_status import scraping_status
+import hashlib
 import logging
+import orjson
+import threading
+import time
 import uuid
 from webapp.task_service.utils import set_task_state  # Updated import
+from webapp.cache.redis_cache import get_cache, set_cache
 from webapp.extensions import socketio  # Correct import for socketio
 # from webapp.scrapers.scraper import scrape_tenders
 
+# Queries are fanned out over a thread pool; starts are staggered so the engines are not hit in one burst
+QUERY_WORKERS = 8
+QUERY_STAGGER_SECONDS = 0.1
+
+# Process-wide cap on pooled connections held by query workers. Requests, the scheduler and other
+# scrapers share the same pool, and running it dry makes get_db_connection reset the whole pool.
+_query_db_slots = threading.BoundedSemaphore(max(1, min(QUERY_WORKERS, DB_POOL_MAX // 4)))
+
+# Site-scoped queries rarely change results within a day; the year is part of the key
+SEARCH_CACHE_TTL = 86400
+
 def fetch_urls_and_terms(db_connection):
     """
     Retrieves URLs and search terms from the database.
@@ -17,11 +34,18 @@ def fetch_urls_and_terms(db_connection):
         tuple: A tuple containing a list of URLs and a list of search terms.
     """
     try:
-        with db_connection.cursor() as cur:
-            cur.execute("SELECT url FROM websites")
-            urls = [row[0] for row in cur.fetchall()]
-            cur.execute("SELECT term FROM search_terms")
-            search_terms = [row[0] for row in cur.fetchall()]
+        # Server-side cursor so rows stream in batches instead of arriving as one result list
+        with db_connection.cursor(name='website_metadata') as cur:
+            cur.itersize = 1000
+            # One query for both lists; the first column says which table a row came from
+            cur.execute("""
+                SELECT 'u', url FROM websites
+                UNION ALL
+                SELECT 't', term FROM search_terms
+            """)
+            urls, search_terms = [], []
+            for kind, value in cur:
+                (urls if kind == 'u' else search_terms).append(value)
             ScrapingLog.add_log(f"Fetched URLs: {urls}")
             ScrapingLog.add_log(f"Fetched Search Terms: {search_terms}")
             return urls, search_terms
@@ -29,6 +53,45 @@ def fetch_urls_and_terms(db_connection):
         ScrapingLog.add_log(f"Error in fetch_urls_and_terms: {e}")
         return [], []
 
+def search_cache_key(query, selected_engines):
+    """
+    Builds the Redis key under which a query's results are cached.
+    Args:
+        query (str): The search query.
+        selected_engines (list): The search engines the query runs on.
+    Returns:
+        str: The cache key, scoped to the current year.
+    """
+    digest = hashlib.sha1(orjson.dumps([sorted(selected_engines), query, datetime.now().year])).hexdigest()
+    return f"website_search:{digest}"
+
+def scrape_query(index, query, selected_engines):
+    """
+    Runs a single search query on its own pooled connection, for use from a worker thread.
+    Results are served from the search cache when the same query ran within the last day.
+    Args:
+        index (int): Position of the query, used to stagger the first batch of requests.
+        query (str): The search query.
+        selected_engines (list): The search engines to query.
+    Returns:
+        list: The scraped tenders, or None if the engines returned nothing.
+    """
+    cache_key = search_cache_key(query, selected_engines)
+    cached_tenders = get_cache(cache_key)
+    if cached_tenders is not None:
+        ScrapingLog.add_log(f"Using cached results for query: {query}")
+        return cached_tenders
+
+    # Only the first batch needs spreading out; later queries start as workers free up
+    if index < QUERY_WORKERS:
+        time.sleep(index * QUERY_STAGGER_SECONDS)
+    ScrapingLog.add_log(f"Scraping for query: {query}")
+    with _query_db_slots, pooled_connection() as conn:
+        scraped_tenders = scrape_tenders(conn, query, selected_engines)
+    if scraped_tenders is not None:
+        set_cache(cache_key, scraped_tenders, expiry=SEARCH_CACHE_TTL)
+    return scraped_tenders
+
 def scrape_tenders_from_websites(selected_engines=None, time_frame=None, file_type=None, terms=None, website=None, scraping_task_id=None):
     """
     Scrapes tenders from specified websites using search terms and stores results in the database.
@@ -107,6 +170,9 @@ def scrape_tenders_from_websites(selected_engines=None, time_frame=None, file_ty
             return
 
         urls, search_terms = fetch_urls_and_terms(db_connection)
+        # Hand the connection back now; each query worker borrows its own from the pool
+        close_db_connection(db_connection)
+        db_connection = None
         if website:
             urls = [website]
             visited_urls.append(website)
@@ -131,39 +197,31 @@ def scrape_tenders_from_websites(selected_engines=None, time_frame=None, file_ty
 
         current_year = datetime.now().year
 
-        google_queries = [
-            f'site:{url.split("//")[1].rstrip("/")} ' +
-            " OR ".join([f'"{term}"' for term in terms]) +
-            (f" {current_year}" if time_frame == 'y' else '') +
+        # The terms clause and filters are the same for every URL and engine; build them once
+        terms_clause = " OR ".join(f'"{term}"' for term in terms) + (f" {current_year}" if time_frame == 'y' else '')
+        has_file_type = file_type and file_type != 'any'
+        google_params = (
             (f"&as_qdr={time_frame}" if time_frame != 'anytime' else '') +
-            f"&as_eq=&as_nlo=&as_nhi=&lr=&" +
-            (f"as_filetype={file_type}&" if file_type and file_type != 'any' else "") +
-            f"as_occt=any&" +
-            f"tbs="
-            for url in urls
-        ]
+            "&as_eq=&as_nlo=&as_nhi=&lr=&" +
+            (f"as_filetype={file_type}&" if has_file_type else "") +
+            "as_occt=any&" +
+            "tbs="
+        )
+
+        google_queries = [f'site:{url.split("//")[1].rstrip("/")} {terms_clause}{google_params}' for url in urls]
 
         bing_queries = [
-            " OR ".join([f'"{term}"' for term in terms]) +
-            (f" {current_year}" if time_frame == 'y' else '') +
-            (f"&qft=+filterui:date:y" if time_frame == 'y' else '') +
-            (f"&filter=all" if file_type and file_type != 'any' else '')
+            terms_clause +
+            ("&qft=+filterui:date:y" if time_frame == 'y' else '') +
+            ("&filter=all" if has_file_type else '')
             # Removed region filter since 'region' parameter is not passed
         ]
 
         yahoo_queries = bing_queries
 
-        duckduckgo_queries = [
-            " OR ".join([f'"{term}"' for term in terms]) +
-            (f" {current_year}" if time_frame == 'y' else '') +
-            (f"&t=hg" if file_type and file_type != 'any' else '')
-        ]
+        duckduckgo_queries = [terms_clause + ("&t=hg" if has_file_type else '')]
 
-        ask_queries = [
-            " OR ".join([f'"{term}"' for term in terms]) +
-            (f" {current_year}" if time_frame == 'y' else '') +
-            (f"&filetype={file_type}" if file_type and file_type != 'any' else '')
-        ]
+        ask_queries = [terms_clause + (f"&filetype={file_type}" if has_file_type else '')]
 
         all_queries = []
         if selected_engines:
@@ -198,58 +256,65 @@ def scrape_tenders_from_websites(selected_engines=None, time_frame=None, file_ty
         ScrapingLog.clear_logs()
         ScrapingLog.add_log("Starting the scraping process.")
 
-        for query in all_queries:
-            ScrapingLog.add_log(f"Scraping for query: {query}")
-            try:
-                scraped_tenders = scrape_tenders(db_connection, query, selected_engines)
-                if scraped_tenders is None:
-                    ScrapingLog.add_log(f"No tenders returned for query: {query}")
-                    continue
-
-                for tender in scraped_tenders:
-                    title = tender.get('title', 'Unknown')
-                    source_url = tender.get('source_url', '')
-                    status = tender.get('status', 'unknown').lower()
-                    if source_url and source_url not in visited_urls:
-                        visited_urls.append(source_url)
-                    if status == "open":
-                        open_tenders += 1
-                    elif status == "closed":
-                        closed_tenders += 1
-                    tenders.append(tender)
-
-                    # Emit an update with the current state
-                    set_task_state(scraping_task_id, {
-                        "status": "running",
-                        "startTime": start_time,
-                        "tenders": tenders,
-                        "visited_urls": visited_urls,
-                        "total_urls": len(visited_urls),
-                        "summary": {
-                            "urlsVisited": len(visited_urls),
-                            "openTenders": open_tenders,
-                            "closedTenders": closed_tenders,
-                            "totalTenders": len(tenders)
-                        }
-                    })
-                    socketio.emit('scrape_update', {
-                        'taskId': scraping_task_id,
-                        'status': 'running',
-                        'startTime': start_time,
-                        'tenders': tenders,
-                        'visitedUrls': visited_urls,
-                        'totalUrls': len(visited_urls),
-                        'summary': {
-                            "urlsVisited": len(visited_urls),
-                            "openTenders": open_tenders,
-                            "closedTenders": closed_tenders,
-                            "totalTenders": len(tenders)
-                        },
-                        'message': f"Processed tender: {title}"
-                    }, namespace='/scraping')
-
-            except Exception as e:
-                ScrapingLog.add_log(f"Error scraping for query {query}: {e}")
+        with ThreadPoolExecutor(max_workers=QUERY_WORKERS) as executor:
+            futures = {
+                executor.submit(scrape_query, i, query, selected_engines): query
+                for i, query in enumerate(all_queries)
+            }
+
+            # Results are merged on this thread as each query finishes
+            for future in as_completed(futures):
+                query = futures[future]
+                try:
+                    scraped_tenders = future.result()
+                    if scraped_tenders is None:
+                        ScrapingLog.add_log(f"No tenders returned for query: {query}")
+                        continue
+
+                    for tender in scraped_tenders:
+                        title = tender.get('title', 'Unknown')
+                        source_url = tender.get('source_url', '')
+                        status = tender.get('status', 'unknown').lower()
+                        if source_url and source_url not in visited_urls:
+                            visited_urls.append(source_url)
+                        if status == "open":
+                            open_tenders += 1
+                        elif status == "closed":
+                            closed_tenders += 1
+                        tenders.append(tender)
+
+                        # Emit an update with the current state
+                        set_task_state(scraping_task_id, {
+                            "status": "running",
+                            "startTime": start_time,
+                            "tenders": tenders,
+                            "visited_urls": visited_urls,
+                            "total_urls": len(visited_urls),
+                            "summary": {
+                                "urlsVisited": len(visited_urls),
+                                "openTenders": open_tenders,
+                                "closedTenders": closed_tenders,
+                                "totalTenders": len(tenders)
+                            }
+                        })
+                        socketio.emit('scrape_update', {
+                            'taskId': scraping_task_id,
+                            'status': 'running',
+                            'startTime': start_time,
+                            'tenders': tenders,
+                            'visitedUrls': visited_urls,
+                            'totalUrls': len(visited_urls),
+                            'summary': {
+                                "urlsVisited": len(visited_urls),
+                                "openTenders": open_tenders,
+                                "closedTenders": closed_tenders,
+                                "totalTenders": len(tenders)
+                            },
+                            'message': f"Processed tender: {title}"
+                        }, namespace='/scraping')
+
+                except Exception as e:
+                    ScrapingLog.add_log(f"Error scraping for query {query}: {e}")
 
         # Calculate time taken
         time_taken = (datetime.now() - datetime.fromisoformat(start_time)).total_seconds()
@@ -319,8 +384,8 @@ def scrape_tenders_from_websites(selected_engines=None, time_frame=None, file_ty
         }, namespace='/scraping')
     finally:
         if db_connection is not None:
-            db_connection.close()
-            ScrapingLog.add_log("Database connection closed.")
+            close_db_connection(db_connection)
+            ScrapingLog.add_log("Database connection returned to pool.")
 
 if __name__ == "__main__":
     scrape_tenders_from_websites()
\ No newline at end of file
@@ -0,0 +1,36 @@
+import logging
+import os
+from datetime import datetime, timedelta, timezone
+from webapp.config import get_db_connection, close_db_connection
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Number of days task log entries are kept
+TASK_LOG_RETENTION_DAYS = int(os.getenv('TASK_LOG_RETENTION_DAYS', 90))
+
+def delete_old_task_logs():
+    """
+    Deletes task_logs entries older than the retention window.
+    """
+    cutoff = datetime.now(timezone.utc) - timedelta(days=TASK_LOG_RETENTION_DAYS)
+
+    conn = None
+    try:
+        conn = get_db_connection()
+        with conn.cursor() as cur:
+            cur.execute("DELETE FROM task_logs WHERE created_at < %s", (cutoff,))
+            deleted_count = cur.rowcount
+        conn.commit()
+        logger.info(f"Deleted {deleted_count} task log entries older than {cutoff}.")
+    except Exception as e:
+        logger.error(f"Error while deleting old task logs: {str(e)}")
+        if conn is not None:
+            conn.rollback()
+    finally:
+        if conn is not None:
+            close_db_connection(conn)
+
+if __name__ == "__main__":
+    delete_old_task_logs()
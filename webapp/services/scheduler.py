@@ -1,5 +1,6 @@
 # webapp/services/scheduler.py
 from apscheduler.schedulers.background import BackgroundScheduler
+from apscheduler.executors.pool import ThreadPoolExecutor
 from apscheduler.events import EVENT_JOB_ERROR, EVENT_JOB_EXECUTED
 import logging
 from datetime import datetime
@@ -15,8 +16,14 @@ def job_listener(event):
     else:
         logging.info('Job %s completed successfully.', event.job_id)
 
+# Manual runs get their own workers so long scrapes never queue behind (or block) interval jobs
+MANUAL_RUN_WORKERS = 4
+
 # Initialize APScheduler
-scheduler = BackgroundScheduler()
+scheduler = BackgroundScheduler(executors={
+    'default': ThreadPoolExecutor(10),
+    'manual': ThreadPoolExecutor(MANUAL_RUN_WORKERS),
+})
 scheduler.add_listener(job_listener, EVENT_JOB_EXECUTED | EVENT_JOB_ERROR)
 
 def get_scraping_function(tender_type):
@@ -1,5 +1,6 @@
 # webapp/socket_handlers.py
 from webapp.task_service.utils import set_task_state, get_task_state 
+from flask_socketio import emit
 from webapp.extensions import socketio  # Updated import for socketio
 import logging
 
@@ -11,6 +12,10 @@ def handle_connect():
 def handle_disconnect():
     logging.info("Client disconnected gracefully from /scraping namespace")
 
+# Tenders included in the join_task snapshot; clients page the rest in with request_full
+SNAPSHOT_TENDER_LIMIT = 50
+FULL_TENDER_CHUNK_SIZE = 100
+
 @socketio.on('join_task', namespace='/scraping')
 def handle_join_task(data):
     task_id = data.get('taskId')
@@ -28,7 +33,8 @@ def handle_join_task(data):
         socketio.emit('scrape_update', {
             'taskId': task_id,
             'status': status,
-            'tenders': tenders,
+            'tenders': tenders[-SNAPSHOT_TENDER_LIMIT:],
+            'tenderCount': len(tenders),
             'visitedUrls': visited_urls,
             'totalUrls': total_urls,
             'summary': summary,
@@ -40,4 +46,20 @@ def handle_join_task(data):
             'taskId': task_id,
             'status': 'idle',
             'startTime': None
-        }, namespace='/scraping')
\ No newline at end of file
+        }, namespace='/scraping')
+
+@socketio.on('request_full', namespace='/scraping')
+def handle_request_full(data):
+    """Send the requesting client every tender of a task in scrape_chunk pages."""
+    task_id = data.get('taskId')
+    logging.info(f"Received request_full event for task_id: {task_id}")
+
+    task_state = get_task_state(task_id)
+    tenders = task_state.get('tenders', []) if task_state else []
+    for offset in range(0, len(tenders), FULL_TENDER_CHUNK_SIZE):
+        emit('scrape_chunk', {
+            'taskId': task_id,
+            'offset': offset,
+            'total': len(tenders),
+            'tenders': tenders[offset:offset + FULL_TENDER_CHUNK_SIZE]
+        })
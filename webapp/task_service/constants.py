@@ -10,6 +10,9 @@ FREQUENCY_INTERVALS = {
     'Monthly': timedelta(days=30)
 }
 
+# Frequency intervals in seconds, for epoch arithmetic in calculate_next_schedule
+FREQUENCY_INTERVAL_SECONDS = {frequency: interval.total_seconds() for frequency, interval in FREQUENCY_INTERVALS.items()}
+
 # Trigger arguments for APScheduler
 TRIGGER_ARGS = {
     'Hourly': {'hours': 1},
@@ -19,14 +22,3 @@ TRIGGER_ARGS = {
     'Weekly': {'weeks': 1},
     'Monthly': {'days': 30}
 }
-
-# Mapping of tender types to scraping functions
-SCRAPING_FUNCTIONS = {
-    'UNGM Tenders': 'scrape_ungm_tenders',
-    'ReliefWeb Jobs': 'fetch_reliefweb_tenders',
-    'Job in Rwanda': 'jobinrwanda_tenders',
-    'Kenya Treasury': 'treasury_ke_tenders',
-    'UNDP': 'scrape_undp_tenders',
-    'PPIP': 'scrape_ppip_tenders',
-    'Search Query Tenders': None
-}
\ No newline at end of file
@@ -1,28 +1,43 @@
 import logging
 from datetime import datetime
-from webapp.config import get_db_connection, close_db_connection
+from webapp.config import db_connection
 
 logger = logging.getLogger(__name__)
 
-def add_notification(user_id, message):
+def add_notification(user_id, message, cur=None):
     """
     Add a notification for a user.
     
+    When ``cur`` is given the insert joins the caller's transaction and the caller commits; a failed
+    insert is rolled back to a savepoint so the caller's own work is unaffected. Otherwise a pooled
+    connection is borrowed and committed here.
+    
     Args:
         user_id (str): The ID of the user.
         message (str): The notification message.
+        cur (cursor, optional): An open cursor to reuse.
     """
-    conn = get_db_connection()
+    if cur is not None:
+        # A savepoint keeps a failed insert from aborting the caller's transaction
+        cur.execute("SAVEPOINT notif")
+        try:
+            cur.execute(
+                "INSERT INTO notifications (user_id, message, created_at, read) VALUES (%s, %s, %s, %s)",
+                (user_id, message, datetime.now(), False)
+            )
+            cur.execute("RELEASE SAVEPOINT notif")
+            logger.info(f"Notification added for user_id {user_id}: {message}")
+        except Exception as e:
+            logger.error(f"Error adding notification for user_id {user_id}: {str(e)}")
+            cur.execute("ROLLBACK TO SAVEPOINT notif")
+        return
+
     try:
-        cur = conn.cursor()
-        cur.execute(
-            "INSERT INTO notifications (user_id, message, created_at, read) VALUES (%s, %s, %s, %s)",
-            (user_id, message, datetime.now(), False)
-        )
-        conn.commit()
+        with db_connection() as conn, conn.cursor() as cur:
+            cur.execute(
+                "INSERT INTO notifications (user_id, message, created_at, read) VALUES (%s, %s, %s, %s)",
+                (user_id, message, datetime.now(), False)
+            )
         logger.info(f"Notification added for user_id {user_id}: {message}")
     except Exception as e:
-        logger.error(f"Error adding notification for user_id {user_id}: {str(e)}")
-    finally:
-        cur.close()
-        close_db_connection(conn)
\ No newline at end of file
+        logger.error(f"Error adding notification for user_id {user_id}: {str(e)}")
\ No newline at end of file
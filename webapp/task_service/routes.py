@@ -1,14 +1,13 @@
 import logging
+import orjson
 import uuid
-import threading
-import re
 import os
+from concurrent.futures import ThreadPoolExecutor
 from . import task_service_bp
-from datetime import datetime, timedelta
-from dateutil import parser
+from datetime import datetime, timedelta, timezone
 from flask import request, jsonify, g
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from webapp.config import get_db_connection, close_db_connection
+from webapp.config import get_db_connection, close_db_connection, db_connection
 from webapp.scrapers.ungm_tenders import scrape_ungm_tenders
 from webapp.scrapers.undp_tenders import scrape_undp_tenders
 from webapp.scrapers.ppip_tenders import scrape_ppip_tenders
@@ -16,14 +15,14 @@ from webapp.scrapers.reliefweb_tenders import fetch_reliefweb_tenders
 from webapp.scrapers.jobinrwanda_tenders import jobinrwanda_tenders
 from webapp.scrapers.treasury_ke_tenders import treasury_ke_tenders
 from webapp.services.email_notifications import notify_open_tenders
+from webapp.services.scheduler import scheduler
 from webapp.extensions import socketio
-from webapp.cache.redis_cache import get_cache, set_cache, delete_cache, redis_client
+from webapp.cache.redis_cache import get_cache_raw, set_cache_raw, delete_cache, redis_client
 from .notifications import add_notification
 from .scheduler import schedule_task_scrape, generate_job_id
-from .constants import SCRAPING_FUNCTIONS
 from .exceptions import TaskNotFoundError, InvalidConfigurationError
-from .utils import format_task_response, fetch_task_details, get_search_terms, set_task_state, get_task_state, delete_task_state
-from psycopg2.extras import Json
+from .utils import get_user_cache_rev, bump_user_cache_rev, make_json_response, format_task_response, format_task_record, fetch_task_details, get_task_bundle, parse_and_validate_emails, parse_iso_datetime, set_task_state, get_task_state, delete_task_state
+from psycopg2.extras import Json, RealDictCursor, execute_values
 from dotenv import load_dotenv
 
 logger = logging.getLogger(__name__)
@@ -31,6 +30,29 @@ logger = logging.getLogger(__name__)
 load_dotenv()
 DEFAULT_RECIPIENT_EMAIL = os.getenv("DEFAULT_RECIPIENT_EMAIL")
 
+# Mapping of tender types to scraping functions. Kept here rather than in constants.py: the scraper
+# modules import task_service.utils, which imports constants, so a table there is an import cycle.
+SCRAPING_DISPATCH = {
+    'UNGM Tenders': scrape_ungm_tenders,
+    'ReliefWeb Jobs': fetch_reliefweb_tenders,
+    'Job in Rwanda': jobinrwanda_tenders,
+    'Kenya Treasury': treasury_ke_tenders,
+    'UNDP': scrape_undp_tenders,
+    'PPIP': scrape_ppip_tenders,
+    'Search Query Tenders': None
+}
+
+# Scrapers that report progress through the Socket.IO task state
+SOCKETIO_SCRAPERS = frozenset(func for func in SCRAPING_DISPATCH.values() if func is not None)
+
+# GET endpoints that answer from Redis and only borrow a connection on a cache miss
+CACHE_FIRST_ENDPOINTS = frozenset({
+    'task_service.get_scraping_tasks', 'task_service.get_tasks', 'task_service.get_next_schedule'
+})
+
+# Open-tender emails are sent here so SMTP latency never holds a scheduler worker
+email_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix='task-email')
+
 
 # --- Database Connection Management ---
 
@@ -38,15 +60,20 @@ DEFAULT_RECIPIENT_EMAIL = os.getenv("DEFAULT_RECIPIENT_EMAIL")
 def before_request():
     """
     Set up a database connection and cursor before each request.
+    
+    Cache-first GET endpoints are skipped so cache hits never touch the pool.
     """
+    if request.method == 'GET' and request.endpoint in CACHE_FIRST_ENDPOINTS:
+        return
     g.conn = get_db_connection()
+    g.conn.autocommit = False
     g.cur = g.conn.cursor()
     logger.debug("Database connection opened for request.")
 
 @task_service_bp.after_request
 def after_request(response):
     """
-    Commit the database transaction and close the connection after each request, unless already committed.
+    Commit the database transaction after each write request, unless already committed.
     
     Args:
         response: The response object.
@@ -54,77 +81,42 @@ def after_request(response):
     Returns:
         The response object.
     """
+    if not hasattr(g, 'conn'):
+        return response
+    # Read-only requests have nothing to commit; a rollback just ends the snapshot
+    if request.method in ('GET', 'HEAD'):
+        g.conn.rollback()
     # Skip commit for PATCH requests to /api/toggle-task-status to avoid redundant commits
-    if request.method == 'PATCH' and request.path.startswith('/api/toggle-task-status'):
+    elif request.method == 'PATCH' and request.path.startswith('/api/toggle-task-status'):
         logger.debug("Skipping commit in after_request for toggle-task-status endpoint.")
     else:
         try:
+            flush_task_logs()
             g.conn.commit()
+            bump_stale_cache_revs()
         except Exception as e:
             logger.error(f"Error committing database transaction: {str(e)}")
             g.conn.rollback()
-
-    # Close cursor and connection
-    if hasattr(g, 'cur'):
-        g.cur.close()
-    if hasattr(g, 'conn'):
-        close_db_connection(g.conn)
-    logger.debug("Database connection closed after request.")
+            g.pop('stale_cache_users', None)
     return response
 
 @task_service_bp.teardown_request
 def teardown_request(exception):
     """
-    Ensure the database connection is closed in case of an exception.
+    Close the cursor and return the connection to the pool exactly once per request.
+    Connections from a failed request are discarded rather than reused.
     
     Args:
         exception: The exception that occurred, if any.
     """
-    if hasattr(g, 'cur'):
-        g.cur.close()
-    if hasattr(g, 'conn'):
-        close_db_connection(g.conn)
+    cur = g.pop('cur', None)
+    if cur is not None:
+        cur.close()
+    conn = g.pop('conn', None)
+    if conn is not None:
+        close_db_connection(conn, close=exception is not None)
     logger.debug("Database connection closed during teardown.")
 
-# --- Socket.IO Event Handlers ---
-
-@socketio.on('join_task', namespace='/scraping')
-def handle_join_task(data):
-    """
-    Handle Socket.IO 'join_task' event to provide scraping task updates.
-    
-    Args:
-        data (dict): The event data containing the task ID.
-    """
-    task_id = data.get('taskId')
-    logger.info(f"Received join_task event for task_id: {task_id}")
-    
-    task_state = get_task_state(task_id)
-    if task_state:
-        status = task_state.get('status', 'idle')
-        tenders = task_state.get('tenders', [])
-        visited_urls = task_state.get('visited_urls', [])
-        total_urls = task_state.get('total_urls', 0)
-        summary = task_state.get('summary', {})
-        start_time = task_state.get('startTime', None)
-        logger.info(f"Task {task_id} found in Redis: status={status}, startTime={start_time}")
-        socketio.emit('scrape_update', {
-            'taskId': task_id,
-            'status': status,
-            'tenders': tenders,
-            'visitedUrls': visited_urls,
-            'totalUrls': total_urls,
-            'summary': summary,
-            'startTime': start_time
-        }, namespace='/scraping')
-    else:
-        logger.info(f"Task {task_id} not found in Redis, emitting idle status")
-        socketio.emit('scrape_update', {
-            'taskId': task_id,
-            'status': 'idle',
-            'startTime': None
-        }, namespace='/scraping')
-
 # --- API Endpoints ---
 
 @task_service_bp.route('/api/scraping-tasks', methods=['GET'])
@@ -133,15 +125,15 @@ def get_scraping_tasks():
     current_user = get_jwt_identity()
     logger.info(f"Fetching tasks for user_id: {current_user}")
 
-    cache_key = f"scraping_tasks:user:{current_user}"
-    cached_tasks = get_cache(cache_key)
-    if cached_tasks is not None:
+    cache_key = f"scraping_tasks:user:{current_user}:rev:{get_user_cache_rev(current_user)}:json"
+    cached_payload = get_cache_raw(cache_key)
+    if cached_payload is not None:
         logger.info(f"Cache hit: Returning cached tasks for user_id: {current_user}")
-        return jsonify({"tasks": cached_tasks}), 200
+        return make_json_response(cached_payload)
 
     try:
-        with get_db_connection() as conn:
-            with conn.cursor() as cur:
+        with db_connection() as conn:
+            with conn.cursor(cursor_factory=RealDictCursor) as cur:
                 cur.execute("""
                     SELECT task_id, name, frequency, start_time, end_time, priority, is_enabled, tender_type, last_run, 
                            email_notifications_enabled, sms_notifications_enabled, slack_notifications_enabled, custom_emails, 
@@ -149,12 +141,12 @@ def get_scraping_tasks():
                     FROM scheduled_tasks
                     WHERE user_id = %s
                 """, (current_user,))
-                tasks = cur.fetchall()
-                task_list = [format_task_response(task) for task in tasks]
+                task_list = [format_task_record(record) for record in cur.fetchall()]
 
-        set_cache(cache_key, task_list, expiry=300)
+        payload = orjson.dumps({"tasks": task_list})
+        set_cache_raw(cache_key, payload, expiry=300)
         logger.info(f"Successfully fetched and cached {len(task_list)} tasks for user_id: {current_user}")
-        return jsonify({"tasks": task_list}), 200
+        return make_json_response(payload)
     except Exception as e:
         logger.error(f"Error fetching tasks for user_id {current_user}: {str(e)}")
         return jsonify({"msg": "Error fetching tasks.", "error": str(e)}), 500
@@ -184,22 +176,11 @@ def create_scraping_task():
         if not task_name or not frequency or not tender_type:
             return jsonify({"msg": "Missing required fields"}), 400
 
-        # Handle custom_emails: convert to string if it's a list
-        if isinstance(custom_emails, list):
-            custom_emails = ','.join([email.strip() for email in custom_emails if email.strip()])
-        elif not isinstance(custom_emails, str):
-            custom_emails = ''
-
-        # Validate emails if custom_emails is non-empty
-        email_list = []
-        if custom_emails:
-            email_list = [email.strip() for email in custom_emails.split(",") if email.strip()]
-            email_regex = r'^[^\s@]+@[^\s@]+\.[^\s@]+$'
-            invalid_emails = [email for email in email_list if not re.match(email_regex, email)]
-            if invalid_emails:
-                return jsonify({"msg": f"Invalid email addresses: {', '.join(invalid_emails)}"}), 400
-
-        with get_db_connection() as conn:
+        custom_emails, invalid_emails = parse_and_validate_emails(custom_emails)
+        if invalid_emails:
+            return jsonify({"msg": f"Invalid email addresses: {', '.join(invalid_emails)}"}), 400
+
+        with db_connection() as conn:
             with conn.cursor() as cur:
                 cur.execute("""
                     INSERT INTO scheduled_tasks (
@@ -217,7 +198,6 @@ def create_scraping_task():
                     custom_emails, search_terms, engines
                 ))
                 task = cur.fetchone()
-                conn.commit()
 
         if task is None:
             logger.error("Database query returned no results")
@@ -226,8 +206,7 @@ def create_scraping_task():
         task_response = format_task_response(task)
 
         # Clear cache
-        cache_key = f"scraping_tasks:user:{current_user}"
-        delete_cache(cache_key)
+        mark_cache_stale(current_user)
 
         return jsonify({
             "msg": "Task added successfully.",
@@ -243,15 +222,15 @@ def get_tasks():
     current_user = get_jwt_identity()
     logger.info(f"Fetching tasks for user_id: {current_user}")
 
-    cache_key = f"scraping_tasks:user:{current_user}"
-    cached_tasks = get_cache(cache_key)
-    if cached_tasks is not None:
+    cache_key = f"scraping_tasks:user:{current_user}:rev:{get_user_cache_rev(current_user)}:json"
+    cached_payload = get_cache_raw(cache_key)
+    if cached_payload is not None:
         logger.info(f"Cache hit: Returning cached tasks for user_id: {current_user}")
-        return jsonify({"tasks": cached_tasks}), 200
+        return make_json_response(cached_payload)
 
     try:
-        with get_db_connection() as conn:
-            with conn.cursor() as cur:
+        with db_connection() as conn:
+            with conn.cursor(cursor_factory=RealDictCursor) as cur:
                 cur.execute("""
                     SELECT task_id, name, frequency, start_time, end_time, priority, is_enabled, tender_type, last_run, 
                            email_notifications_enabled, sms_notifications_enabled, slack_notifications_enabled, custom_emails, 
@@ -259,12 +238,12 @@ def get_tasks():
                     FROM scheduled_tasks
                     WHERE user_id = %s
                 """, (current_user,))
-                tasks = cur.fetchall()
-                task_list = [format_task_response(task) for task in tasks]
+                task_list = [format_task_record(record) for record in cur.fetchall()]
 
-        set_cache(cache_key, task_list, expiry=300)
+        payload = orjson.dumps({"tasks": task_list})
+        set_cache_raw(cache_key, payload, expiry=300)
         logger.info(f"Successfully fetched and cached {len(task_list)} tasks for user_id: {current_user}")
-        return jsonify({"tasks": task_list}), 200
+        return make_json_response(payload)
     except Exception as e:
         logger.error(f"Error fetching tasks: {str(e)}")
         return jsonify({"msg": "Error fetching tasks.", "error": str(e)}), 500
@@ -314,12 +293,9 @@ def create_task():
         if not engines:
             return jsonify({"msg": "Search engines are required for Search Query Tenders."}), 400
 
-    if custom_emails:
-        email_list = [email.strip() for email in custom_emails.split(",")]
-        email_regex = r'^[^\s@]+@[^\s@]+\.[^\s@]+$'
-        invalid_emails = [email for email in email_list if not re.match(email_regex, email)]
-        if invalid_emails:
-            return jsonify({"msg": f"Invalid email addresses: {', '.join(invalid_emails)}"}), 400
+    custom_emails, invalid_emails = parse_and_validate_emails(custom_emails)
+    if invalid_emails:
+        return jsonify({"msg": f"Invalid email addresses: {', '.join(invalid_emails)}"}), 400
 
     current_time = datetime.now()
     start_time = current_time
@@ -345,7 +321,7 @@ def create_task():
         """, (
             current_user, name, frequency, start_time, end_time,
             priority, True, tender_type,
-            ','.join(engines), time_frame, file_type, selected_region,
+            engines, time_frame, file_type, selected_region,
             email_notifications_enabled, sms_notifications_enabled, slack_notifications_enabled, custom_emails
         ))
 
@@ -354,28 +330,28 @@ def create_task():
         logger.info(f"Inserted new task with task_id: {task_id}")
 
         if search_terms:
-            for term in search_terms:
-                try:
-                    g.cur.execute("INSERT INTO task_search_terms (task_id, term) VALUES (%s, %s)", (task_id, term))
-                except Exception as e:
-                    logger.error(f"Error inserting term '{term}' for task_id {task_id}: {str(e)}")
+            try:
+                execute_values(
+                    g.cur,
+                    "INSERT INTO task_search_terms (task_id, term) VALUES %s",
+                    [(task_id, term) for term in search_terms],
+                    page_size=500
+                )
+            except Exception as e:
+                logger.error(f"Error inserting search terms for task_id {task_id}: {str(e)}")
+                raise
 
         task_dict = format_task_response(task, search_terms)
 
-        from webapp.services.scheduler import scheduler
-        scraping_function_name = SCRAPING_FUNCTIONS.get(tender_type)
-        if scraping_function_name:
-            scraping_function = globals().get(scraping_function_name)
-            if scraping_function:
-                schedule_task_scrape(
-                    scheduler, socketio, current_user, task_id, scraping_function, frequency,
-                    tender_type=tender_type, search_terms=search_terms, search_engines=engines
-                )
+        scraping_function = SCRAPING_DISPATCH.get(tender_type)
+        if scraping_function:
+            schedule_task_scrape(
+                scheduler, socketio, current_user, task_id, scraping_function, frequency,
+                tender_type=tender_type, search_terms=search_terms, search_engines=engines
+            )
 
         log_task_event(task_id, current_user, f'Task "{name}" created successfully.')
-        add_notification(current_user, f"Task '{name}' created successfully.")
-
-        delete_cache(f"scraping_tasks:user:{current_user}")
+        add_notification(current_user, f"Task '{name}' created successfully.", cur=g.cur)
 
         return jsonify({
             "msg": "Task created successfully.",
@@ -402,25 +378,21 @@ def run_scheduled_task(task_id):
     logger.info(f"User {current_user} is attempting to manually run task ID {task_id}.")
 
     try:
-        task = fetch_task_details(task_id, current_user, """
-            task_id, name, frequency, start_time, end_time, priority, is_enabled, tender_type, last_run, 
-            search_engines, time_frame, file_type, selected_region, email_notifications_enabled, custom_emails
-        """)
-
-        tender_type = task[7]
-        search_engines = task[9].split(',') if task[9] else []
-        time_frame = task[10]
-        file_type = task[11]
-        selected_region = task[12]
-        email_notifications_enabled = task[13]
-        custom_emails = task[14] or ""
-
-        search_terms = get_search_terms(task_id)
-        scraping_function_name = SCRAPING_FUNCTIONS.get(tender_type)
-        scraping_function = globals().get(scraping_function_name) if scraping_function_name else None
+        task, search_terms = get_task_bundle(task_id, current_user, update_last_run=True)
+
+        tender_type = task.tender_type
+        search_engines = task.search_engines or []
+        time_frame = task.time_frame
+        file_type = task.file_type
+        selected_region = task.selected_region
+        email_notifications_enabled = task.email_notifications_enabled
+        custom_emails = task.custom_emails or ""
+
+        scraping_function = SCRAPING_DISPATCH.get(tender_type)
 
         if not scraping_function and tender_type != 'Search Query Tenders':
             logger.warning(f"No scraping function found for tender type: {tender_type}")
+            g.conn.rollback()
             return jsonify({"msg": "Manual run not supported for this tender type."}), 400
 
         scraping_task_id = str(uuid.uuid4())
@@ -438,89 +410,35 @@ def run_scheduled_task(task_id):
             'taskId': scraping_task_id,
             'status': 'running',
             'startTime': start_time,
-            'message': f"Started scraping for task: {task[1]}"
+            'message': f"Started scraping for task: {task.name}"
         }, namespace='/scraping')
 
-        def run_scraping_task():
-            from webapp.config import get_db_connection, close_db_connection
-            db_connection = get_db_connection()
-            tenders = []
-            try:
-                if tender_type == 'Search Query Tenders':
-                    from webapp.scrapers.run_query_scraper import scrape_tenders_from_query
-                    query = ' '.join(search_terms) if search_terms else ''
-                    if not query or not search_engines:
-                        logger.warning(f"Cannot run Search Query Tenders task {task_id}: Missing search terms or engines")
-                        socketio.emit('scrape_update', {
-                            'taskId': scraping_task_id,
-                            'status': 'error',
-                            'startTime': start_time,
-                            'message': "Missing search terms or engines."
-                        }, namespace='/scraping')
-                        add_notification(
-                            current_user,
-                            f"Task '{task[1]}' failed to run: Missing search terms or engines."
-                        )
-                        return
-                    logger.info(f"Starting manual scraping task for task_id {task_id} with scraping_task_id: {scraping_task_id}, query: {query}, engines: {search_engines}")
-                    tenders = scrape_tenders_from_query(db_connection, query, search_engines, scraping_task_id)
-                else:
-                    logger.info(f"Starting manual scraping task for task_id {task_id} with scraping_task_id: {scraping_task_id}, tender_type: {tender_type}")
-                    if scraping_function in [scrape_ungm_tenders, fetch_reliefweb_tenders, jobinrwanda_tenders,
-                                            treasury_ke_tenders, scrape_undp_tenders, scrape_ppip_tenders]:
-                        scraping_function(
-                            scraping_task_id=scraping_task_id,
-                            set_task_state=set_task_state,
-                            socketio=socketio
-                        )
-                        task_state = get_task_state(scraping_task_id)
-                        tenders = task_state.get("tenders", []) if task_state else []
-                    else:
-                        scraping_function(
-                            selected_engines=search_engines,
-                            time_frame=time_frame,
-                            file_type=file_type,
-                            region=selected_region,
-                            terms=search_terms
-                        )
-
-                if email_notifications_enabled and tenders:
-                    logger.info(f"Email notifications enabled for task {task_id}. Sending notifications to: {custom_emails}")
-                    recipient_emails = custom_emails if custom_emails else DEFAULT_RECIPIENT_EMAIL
-                    notify_open_tenders(tenders, task_id, recipient_emails=recipient_emails)
-                    open_tenders_count = len([t for t in tenders if t.get('status') == 'open'])
-                    if open_tenders_count > 0:
-                        add_notification(
-                            current_user,
-                            f"Task '{task[1]}' found {open_tenders_count} new open tender(s)."
-                        )
-
-                # Log final tender count
-                task_state = get_task_state(scraping_task_id)
-                open_tenders_count = len([t for t in tenders if t.get('status') == 'open'])
-                expired_tenders_count = task_state.get('summary', {}).get('closedTenders', 0) if task_state else 0
-                total_tenders_count = task_state.get('summary', {}).get('totalTenders', 0) if task_state else 0
-                logger.info(f"Scraping completed for task {task_id} (scraping_task_id: {scraping_task_id}). Total tenders found: {total_tenders_count}, Open: {open_tenders_count}, Expired: {expired_tenders_count}")
-
-            except Exception as e:
-                logger.error(f"Error in background scraping task for task_id {task_id} (scraping_task_id: {scraping_task_id}): {str(e)}")
-                socketio.emit('scrape_update', {
-                    'taskId': scraping_task_id,
-                    'status': 'error',
-                    'startTime': start_time,
-                    'message': f"Error: {str(e)}"
-                }, namespace='/scraping')
-                add_notification(
-                    current_user,
-                    f"Task '{task[1]}' failed to run: {str(e)}"
-                )
-            finally:
-                close_db_connection(db_connection)
-
-        threading.Thread(target=run_scraping_task, daemon=True).start()
+        scheduler.add_job(
+            run_scheduled_task_job,
+            trigger='date',
+            run_date=datetime.now(),
+            id=f"manual_{scraping_task_id}",
+            kwargs={
+                "task_id": task_id,
+                "user_id": current_user,
+                "task_name": task.name,
+                "scraping_task_id": scraping_task_id,
+                "start_time": start_time,
+                "tender_type": tender_type,
+                "scraping_function": scraping_function,
+                "search_terms": search_terms,
+                "search_engines": search_engines,
+                "time_frame": time_frame,
+                "file_type": file_type,
+                "selected_region": selected_region,
+                "email_notifications_enabled": email_notifications_enabled,
+                "custom_emails": custom_emails
+            },
+            executor='manual',
+            misfire_grace_time=60
+        )
 
-        g.cur.execute("UPDATE scheduled_tasks SET last_run = %s WHERE task_id = %s", (datetime.now(), task_id))
-        log_task_event(task_id, current_user, f'Task "{task[1]}" manually started with scraping_task_id {scraping_task_id}.')
+        log_task_event(task_id, current_user, f'Task "{task.name}" manually started with scraping_task_id {scraping_task_id}.')
         return jsonify({
             "msg": "Task started successfully.",
             "scraping_task_id": scraping_task_id
@@ -530,102 +448,82 @@ def run_scheduled_task(task_id):
         return jsonify({"msg": str(e)}), 404
     except Exception as e:
         logger.error(f"Error running task {task_id}: {str(e)}")
+        g.conn.rollback()
         return jsonify({"msg": "Error running task."}), 500
     
 @task_service_bp.route('/api/run-task/<int:task_id>', methods=['POST'], endpoint='run_task')
 @jwt_required()
 def run_task(task_id):
     """
-    Run a scraping task synchronously.
+    Queue a scraping task for immediate execution on the scheduler.
     
     Args:
         task_id (int): The ID of the task to run.
     
     Returns:
-        JSON response indicating success or failure.
+        JSON response with the queued run ID.
     """
     current_user = get_jwt_identity()
     logger.info(f"User {current_user} requested to run task ID {task_id}")
 
     try:
-        task = fetch_task_details(task_id, current_user, """
-            user_id, name, tender_type, frequency, search_engines, time_frame, file_type, selected_region, 
-            email_notifications_enabled, custom_emails
-        """)
-
-        search_terms = get_search_terms(task_id)
-        selected_engines = task[4].split(',') if task[4] else []
-        time_frame = task[5]
-        file_type = task[6]
-        selected_region = task[7]
-        email_notifications_enabled = task[8]
-        custom_emails = task[9] or ""
-
-        scraping_function_name = SCRAPING_FUNCTIONS.get(task[2])
-        scraping_function = globals().get(scraping_function_name) if scraping_function_name else None
-        if scraping_function:
-            try:
-                logger.info(f"Running task '{task[1]}' with search terms: {search_terms}.")
-                tenders = []
-                if scraping_function in [scrape_ungm_tenders, fetch_reliefweb_tenders, jobinrwanda_tenders,
-                                        treasury_ke_tenders, scrape_undp_tenders, scrape_ppip_tenders]:
-                    scraping_function()
-                elif task[2] == 'Search Query Tenders':
-                    from webapp.scrapers.run_query_scraper import scrape_tenders_from_query
-                    query = ' '.join(search_terms) if search_terms else ''
-                    if not query:
-                        add_notification(current_user, f"Task '{task[1]}' failed to run: No search terms provided.")
-                        return jsonify({"msg": "No search terms provided for Search Query Tenders."}), 400
-                    tenders = scrape_tenders_from_query(g.conn, query, selected_engines, task_id)
-                else:
-                    scraping_function(selected_engines=selected_engines, time_frame=time_frame, file_type=file_type, region=selected_region, terms=search_terms)
-
-                if email_notifications_enabled and tenders:
-                    logger.info(f"Email notifications enabled for task {task_id}. Sending notifications to: {custom_emails}")
-                    recipient_emails = custom_emails if custom_emails else DEFAULT_RECIPIENT_EMAIL
-                    notify_open_tenders(tenders, task_id, recipient_emails=recipient_emails)
-                    open_tenders_count = len([t for t in tenders if t.get('status') == 'open'])
-                    if open_tenders_count > 0:
-                        add_notification(
-                            current_user,
-                            f"Task '{task[1]}' found {open_tenders_count} new open tender(s)."
-                        )
+        task, search_terms = get_task_bundle(task_id, current_user)
+
+        selected_engines = task.search_engines or []
+        time_frame = task.time_frame
+        file_type = task.file_type
+        selected_region = task.selected_region
+        email_notifications_enabled = task.email_notifications_enabled
+        custom_emails = task.custom_emails or ""
+
+        scraping_function = SCRAPING_DISPATCH.get(task.tender_type)
+        # Search Query tasks have no dispatch entry; they run through the query scraper
+        if task.tender_type == 'Search Query Tenders':
+            if not search_terms:
+                add_notification(current_user, f"Task '{task.name}' failed to run: No search terms provided.", cur=g.cur)
+                return jsonify({"msg": "No search terms provided for Search Query Tenders."}), 400
+            if not selected_engines:
+                add_notification(current_user, f"Task '{task.name}' failed to run: No search engines selected.", cur=g.cur)
+                return jsonify({"msg": "No search engines selected for Search Query Tenders."}), 400
+            from webapp.scrapers.run_query_scraper import scrape_tenders_from_query
+            scraping_function = scrape_tenders_from_query
 
-            except Exception as e:
-                logger.error(f"Error running task '{task[1]}': {str(e)}")
-                add_notification(current_user, f"Task '{task[1]}' failed to run: {str(e)}")
-                return jsonify({"msg": f"Error running task: {str(e)}"}), 500
-
-            g.cur.execute("UPDATE scheduled_tasks SET last_run = %s WHERE task_id = %s", (datetime.now(), task_id))
+        if scraping_function:
+            run_id = f"run_{generate_job_id(current_user, task_id)}_{uuid.uuid4().hex}"
+            scheduler.add_job(
+                run_task_job,
+                trigger='date',
+                run_date=datetime.now(),
+                id=run_id,
+                kwargs={
+                    "task_id": task_id,
+                    "user_id": current_user,
+                    "task_name": task.name,
+                    "tender_type": task.tender_type,
+                    "scraping_function": scraping_function,
+                    "search_terms": search_terms,
+                    "selected_engines": selected_engines,
+                    "time_frame": time_frame,
+                    "file_type": file_type,
+                    "selected_region": selected_region,
+                    "email_notifications_enabled": email_notifications_enabled,
+                    "custom_emails": custom_emails
+                },
+                executor='manual',
+                misfire_grace_time=60
+            )
+            logger.info(f"Queued task '{task.name}' as run {run_id}.")
 
-            from webapp.services.scheduler import scheduler
             schedule_task_scrape(
-                scheduler, socketio, current_user, task_id,
-                scraping_function if scraping_function else scrape_tenders_from_query,
-                task[3], tender_type=task[2], search_terms=search_terms, search_engines=selected_engines
+                scheduler, socketio, current_user, task_id, scraping_function,
+                task.frequency, tender_type=task.tender_type, search_terms=search_terms, search_engines=selected_engines
             )
 
-        log_task_event(task_id, current_user, f"Task '{task[1]}' has been executed.")
-        delete_cache(f"scraping_tasks:user:{current_user}")
-        return jsonify({"msg": f"Task '{task[1]}' has been executed."}), 200
-    except TaskNotFoundError as e:
-        return jsonify({"msg": str(e)}), 404
-    except Exception as e:
-        logger.error(f"Error running task {task_id}: {str(e)}")
-        return jsonify({"msg": "Error running task."}), 500
+            log_task_event(task_id, current_user, f"Task '{task.name}' has been queued for execution.")
+            return jsonify({"msg": "queued", "run_id": run_id}), 202
 
-        g.cur.execute("UPDATE scheduled_tasks SET last_run = %s WHERE task_id = %s", (datetime.now(), task_id))
-
-        from webapp.services.scheduler import scheduler
-        schedule_task_scrape(
-            scheduler, socketio, current_user, task_id,
-            scraping_function if scraping_function else scrape_tenders_from_query,
-            task[3], tender_type=task[2], search_terms=search_terms, search_engines=selected_engines
-        )
-
-        log_task_event(task_id, current_user, f"Task '{task[1]}' has been executed.")
-        delete_cache(f"scraping_tasks:user:{current_user}")
-        return jsonify({"msg": f"Task '{task[1]}' has been executed."}), 200
+        log_task_event(task_id, current_user, f"Task '{task.name}' has been executed.")
+        return jsonify({"msg": f"Task '{task.name}' has been executed."}), 200
     except TaskNotFoundError as e:
         return jsonify({"msg": str(e)}), 404
     except Exception as e:
@@ -646,10 +544,10 @@ def get_task_logs(task_id):
     """
     current_user = get_jwt_identity()
 
-    cache_key = f"task_logs:user:{current_user}:task:{task_id}"
-    cached_logs = get_cache(cache_key)
-    if cached_logs is not None:
-        return jsonify({"logs": cached_logs}), 200
+    cache_key = f"task_logs:user:{current_user}:rev:{get_user_cache_rev(current_user)}:task:{task_id}:json"
+    cached_payload = get_cache_raw(cache_key)
+    if cached_payload is not None:
+        return make_json_response(cached_payload)
 
     try:
         g.cur.execute("SELECT log_entry, created_at FROM task_logs WHERE task_id = %s AND user_id = %s",
@@ -659,9 +557,11 @@ def get_task_logs(task_id):
         if not logs:
             return jsonify({"msg": "No logs found for this task."}), 404
 
-        logs_list = [{"log_entry": log[0], "created_at": log[1].isoformat() if log[1] else None} for log in logs]
-        set_cache(cache_key, logs_list, expiry=60)
-        return jsonify({"logs": logs_list}), 200
+        # orjson renders created_at in the same ISO format isoformat() produced
+        logs_list = [{"log_entry": log[0], "created_at": log[1]} for log in logs]
+        payload = orjson.dumps({"logs": logs_list})
+        set_cache_raw(cache_key, payload, expiry=60)
+        return make_json_response(payload)
     except Exception as e:
         logger.error(f"Error fetching logs for task {task_id}: {str(e)}")
         return jsonify({"msg": "Error fetching logs."}), 500
@@ -677,21 +577,27 @@ def get_all_task_logs():
     """
     current_user = get_jwt_identity()
 
-    cache_key = f"all_task_logs:user:{current_user}"
-    cached_logs = get_cache(cache_key)
-    if cached_logs is not None:
-        return jsonify({"logs": cached_logs}), 200
+    cache_key = f"all_task_logs:user:{current_user}:rev:{get_user_cache_rev(current_user)}:json"
+    cached_payload = get_cache_raw(cache_key)
+    if cached_payload is not None:
+        return make_json_response(cached_payload)
 
     try:
-        g.cur.execute("SELECT task_id, log_entry, created_at FROM task_logs WHERE user_id = %s", (current_user,))
-        logs = g.cur.fetchall()
-
-        if not logs:
+        # Stream rows through a server-side cursor instead of materializing the full result set twice
+        with g.conn.cursor(name='all_task_logs') as cur:
+            cur.itersize = 2000
+            cur.execute("SELECT task_id, log_entry, created_at FROM task_logs WHERE user_id = %s", (current_user,))
+            logs_list = [
+                {"task_id": log[0], "log_entry": log[1], "created_at": log[2]}
+                for log in cur
+            ]
+
+        if not logs_list:
             return jsonify({"msg": "No logs found for this user."}), 404
 
-        logs_list = [{"task_id": log[0], "log_entry": log[1], "created_at": log[2].isoformat() if log[2] else None} for log in logs]
-        set_cache(cache_key, logs_list, expiry=60)
-        return jsonify({"logs": logs_list}), 200
+        payload = orjson.dumps({"logs": logs_list})
+        set_cache_raw(cache_key, payload, expiry=60)
+        return make_json_response(payload)
     except Exception as e:
         logger.error(f"Error fetching all logs: {str(e)}")
         return jsonify({"msg": "Error fetching logs."}), 500
@@ -712,14 +618,23 @@ def clear_logs(task_id):
     logger.info(f"User {current_user} is attempting to clear logs for task ID {task_id}.")
 
     try:
-        task = fetch_task_details(task_id, current_user, "user_id, name")
         logger.info(f"Deleting logs for task ID {task_id} for user {current_user}.")
+        # Check ownership and delete the logs in one statement
+        g.cur.execute("""
+            WITH task AS (
+                SELECT name FROM scheduled_tasks WHERE task_id = %s AND user_id = %s
+            ), deleted AS (
+                DELETE FROM task_logs
+                WHERE task_id = %s AND user_id = %s AND EXISTS (SELECT 1 FROM task)
+            )
+            SELECT name FROM task
+        """, (task_id, current_user, task_id, current_user))
+        task = g.cur.fetchone()
+        if not task:
+            raise TaskNotFoundError("Task not found or access denied.")
+        mark_cache_stale(current_user)
 
-        g.cur.execute("DELETE FROM task_logs WHERE task_id = %s AND user_id = %s", (task_id, current_user))
-        delete_cache(f"task_logs:user:{current_user}:task:{task_id}")
-        delete_cache(f"all_task_logs:user:{current_user}")
-
-        add_notification(current_user, f"Logs cleared for task '{task[1]}'.")
+        add_notification(current_user, f"Logs cleared for task '{task[0]}'.", cur=g.cur)
         logger.info(f"Logs cleared successfully for task ID {task_id}.")
         return jsonify({"msg": "Logs cleared successfully."}), 200
     except TaskNotFoundError as e:
@@ -743,18 +658,25 @@ def cancel_task(task_id):
     current_user = get_jwt_identity()
 
     try:
-        task = fetch_task_details(task_id, current_user, "user_id, name")
-        g.cur.execute("DELETE FROM task_search_terms WHERE task_id = %s", (task_id,))
-        g.cur.execute("DELETE FROM scheduled_tasks WHERE task_id = %s", (task_id,))
+        # Ownership is checked by the deletes themselves; terms go first for the foreign key
+        g.cur.execute("""
+            DELETE FROM task_search_terms
+            WHERE task_id = %s AND EXISTS (SELECT 1 FROM scheduled_tasks WHERE task_id = %s AND user_id = %s)
+        """, (task_id, task_id, current_user))
+        g.cur.execute("DELETE FROM scheduled_tasks WHERE task_id = %s AND user_id = %s RETURNING name",
+                      (task_id, current_user))
+        task = g.cur.fetchone()
+        if not task:
+            raise TaskNotFoundError("Task not found or access denied.")
 
         # Remove the scheduled job if it exists
-        from webapp.services.scheduler import scheduler
         job_id = generate_job_id(current_user, task_id)
         if scheduler.get_job(job_id):
             scheduler.remove_job(job_id)
 
-        delete_cache(f"scraping_tasks:user:{current_user}")
-        add_notification(current_user, f"Task '{task[1]}' canceled successfully.")
+        mark_cache_stale(current_user)
+        delete_cache(f"task:{current_user}:{task_id}")
+        add_notification(current_user, f"Task '{task[0]}' canceled successfully.", cur=g.cur)
         return jsonify({"msg": "Task canceled successfully."}), 200
     except TaskNotFoundError as e:
         return jsonify({"msg": str(e)}), 404
@@ -777,32 +699,28 @@ def toggle_task_status(task_id):
     current_user = get_jwt_identity()
 
     try:
-        # Fetch task details
-        task = fetch_task_details(task_id, current_user, "user_id, is_enabled, name")
-        if not task or len(task) < 3:
-            raise ValueError(f"Invalid task data returned for task_id {task_id}: {task}")
-
-        new_status = not task[1]  # Toggle is_enabled
-        # Execute update query
+        # Flip is_enabled and read back the result in one statement
         g.cur.execute(
-            "UPDATE scheduled_tasks SET is_enabled = %s WHERE task_id = %s",
-            (new_status, task_id)
+            "UPDATE scheduled_tasks SET is_enabled = NOT is_enabled WHERE task_id = %s AND user_id = %s RETURNING name, is_enabled",
+            (task_id, current_user)
         )
-        # Commit the transaction
-        g.conn.commit()  # Use g.conn instead of g.db
+        task = g.cur.fetchone()
+        if not task:
+            raise TaskNotFoundError("Task not found or access denied.")
 
+        new_status = task[1]
         status_message = 'enabled' if new_status else 'disabled'
-        log_task_event(task_id, current_user, f'Task "{task[2]}" has been {status_message} successfully.')
-        add_notification(current_user, f"Task '{task[2]}' {status_message} successfully.")
-        delete_cache(f"scraping_tasks:user:{current_user}")
+        log_task_event(task_id, current_user, f'Task "{task[0]}" has been {status_message} successfully.')
+        add_notification(current_user, f"Task '{task[0]}' {status_message} successfully.", cur=g.cur)
+        # Commit the update, log entry and notification together
+        flush_task_logs()
+        g.conn.commit()
+        bump_stale_cache_revs()
         return jsonify({"msg": f"Task {task_id} {status_message} successfully."}), 200
 
     except TaskNotFoundError as e:
         logger.warning(f"Task not found: {str(e)}")
         return jsonify({"msg": str(e)}), 404
-    except ValueError as e:
-        logger.error(f"Validation error for task {task_id}: {str(e)}", exc_info=True)
-        return jsonify({"msg": f"Invalid task data: {str(e)}"}), 400
     except Exception as e:
         logger.error(f"Error toggling task status for task {task_id}: {str(e)}", exc_info=True)
         return jsonify({"msg": f"Error toggling task status: {str(e)}"}), 500
@@ -842,9 +760,9 @@ def edit_task(task_id):
     # Handle start_time and end_time
     if data.get('startTime') and data.get('endTime'):
         try:
-            start_time = parser.parse(data.get('startTime'))
-            end_time = parser.parse(data.get('endTime'))
-        except ValueError:
+            start_time = parse_iso_datetime(data.get('startTime'))
+            end_time = parse_iso_datetime(data.get('endTime'))
+        except (TypeError, ValueError):
             return jsonify({"msg": "Invalid date format for start time or end time."}), 400
     else:
         current_time = datetime.now()
@@ -873,21 +791,9 @@ def edit_task(task_id):
         else:
             return jsonify({"msg": "Unsupported frequency provided."}), 400
 
-    # Handle custom_emails: convert to string if it's a list
-    if isinstance(custom_emails, list):
-        custom_emails = ','.join([email.strip() for email in custom_emails if email.strip()])
-        logger.warning(f"Received custom_emails as list: {custom_emails}, converted to string")
-    elif not isinstance(custom_emails, str):
-        custom_emails = ''
-
-    # Validate emails if custom_emails is non-empty
-    email_list = []
-    if custom_emails:
-        email_list = [email.strip() for email in custom_emails.split(",") if email.strip()]
-        email_regex = r'^[^\s@]+@[^\s@]+\.[^\s@]+$'
-        invalid_emails = [email for email in email_list if not re.match(email_regex, email)]
-        if invalid_emails:
-            return jsonify({"msg": f"Invalid email addresses: {', '.join(invalid_emails)}"}), 400
+    custom_emails, invalid_emails = parse_and_validate_emails(custom_emails)
+    if invalid_emails:
+        return jsonify({"msg": f"Invalid email addresses: {', '.join(invalid_emails)}"}), 400
 
     try:
         # Fetch existing task details for change logging
@@ -900,84 +806,57 @@ def edit_task(task_id):
         )
 
         # Log changes
-        changes = []
-        if task_name != task[1]:
-            changes.append(f'Task name changed from "{task[1]}" to "{task_name}"')
-        if frequency != task[2]:
-            changes.append(f'Frequency changed from "{task[2]}" to "{frequency}"')
-        if start_time != task[3]:
-            changes.append(f'Start time changed from "{task[3]}" to "{start_time}"')
-        if end_time != task[4]:
-            changes.append(f'End time changed from "{task[4]}" to "{end_time}"')
-        if priority != task[5]:
-            changes.append(f'Priority changed from "{task[5]}" to "{priority}"')
-        if tender_type != task[6]:
-            changes.append(f'Tender type changed from "{task[6]}" to "{tender_type}"')
-        if email_notifications_enabled != task[7]:
-            changes.append(f'Email notifications enabled changed from "{task[7]}" to "{email_notifications_enabled}"')
-        if sms_notifications_enabled != task[8]:
-            changes.append(f'SMS notifications enabled changed from "{task[8]}" to "{sms_notifications_enabled}"')
-        if slack_notifications_enabled != task[9]:
-            changes.append(f'Slack notifications enabled changed from "{task[9]}" to "{slack_notifications_enabled}"')
-        if custom_emails != task[10]:
-            changes.append(f'Custom emails changed from "{task[10]}" to "{custom_emails}"')
-        if search_terms != task[11]:
-            changes.append(f'Search terms changed from "{task[11]}" to "{search_terms}"')
-        if engines != task[12]:
-            changes.append(f'Engines changed from "{task[12]}" to "{engines}"')
-
-        # Update the task
-        g.cur.execute("""
-            UPDATE scheduled_tasks
-            SET name = %s, frequency = %s, start_time = %s, end_time = %s, priority = %s,
-                tender_type = %s, email_notifications_enabled = %s,
-                sms_notifications_enabled = %s, slack_notifications_enabled = %s,
-                custom_emails = %s, search_terms = %s, engines = %s
-            WHERE task_id = %s AND user_id = %s
-            RETURNING task_id, name, frequency, start_time, end_time, priority, tender_type,
-                      email_notifications_enabled, sms_notifications_enabled,
-                      slack_notifications_enabled, custom_emails, search_terms, engines
-        """, (
-            task_name, frequency, start_time, end_time, priority, tender_type,
-            email_notifications_enabled, sms_notifications_enabled, slack_notifications_enabled,
-            custom_emails, search_terms, engines,
-            task_id, current_user
-        ))
-
-        updated_task = g.cur.fetchone()
+        diff_spec = (
+            ("Task name", task[1], task_name),
+            ("Frequency", task[2], frequency),
+            ("Start time", task[3], start_time),
+            ("End time", task[4], end_time),
+            ("Priority", task[5], priority),
+            ("Tender type", task[6], tender_type),
+            ("Email notifications enabled", task[7], email_notifications_enabled),
+            ("SMS notifications enabled", task[8], sms_notifications_enabled),
+            ("Slack notifications enabled", task[9], slack_notifications_enabled),
+            ("Custom emails", task[10], custom_emails),
+            ("Search terms", task[11], search_terms),
+            ("Engines", task[12], engines),
+        )
+        changes = [f'{label} changed from "{old}" to "{new}"' for label, old, new in diff_spec if new != old]
+
+        # Update the task; the dict cursor returns the response body keyed by column
+        with g.conn.cursor(cursor_factory=RealDictCursor) as cur:
+            cur.execute("""
+                UPDATE scheduled_tasks
+                SET name = %s, frequency = %s, start_time = %s, end_time = %s, priority = %s,
+                    tender_type = %s, email_notifications_enabled = %s,
+                    sms_notifications_enabled = %s, slack_notifications_enabled = %s,
+                    custom_emails = %s, search_terms = %s, engines = %s
+                WHERE task_id = %s AND user_id = %s
+                RETURNING task_id, name, frequency, start_time, end_time, priority, tender_type,
+                          email_notifications_enabled, sms_notifications_enabled,
+                          slack_notifications_enabled, custom_emails, search_terms, engines
+            """, (
+                task_name, frequency, start_time, end_time, priority, tender_type,
+                email_notifications_enabled, sms_notifications_enabled, slack_notifications_enabled,
+                custom_emails, search_terms, engines,
+                task_id, current_user
+            ))
+            task_response = cur.fetchone()
         g.conn.commit()
 
-        if updated_task is None:
+        if task_response is None:
             logger.error(f"Task {task_id} not found or user not authorized")
             return jsonify({"msg": "Task not found or unauthorized"}), 404
 
-        # Prepare response
-        task_response = {
-            "task_id": updated_task[0],
-            "name": updated_task[1],
-            "frequency": updated_task[2],
-            "start_time": updated_task[3].isoformat(),
-            "end_time": updated_task[4].isoformat(),
-            "priority": updated_task[5],
-            "tender_type": updated_task[6],
-            "email_notifications_enabled": updated_task[7],
-            "sms_notifications_enabled": updated_task[8],
-            "slack_notifications_enabled": updated_task[9],
-            "custom_emails": updated_task[10],
-            "search_terms": updated_task[11],
-            "engines": updated_task[12],
-        }
-
         # Log changes
         log_message = ' and '.join(changes) if changes else 'Task updated with no changes.'
         log_task_event(task_id, current_user, log_message)
-        add_notification(current_user, f"Task '{task_name}' updated: {log_message}")
-        delete_cache(f"scraping_tasks:user:{current_user}")
+        add_notification(current_user, f"Task '{task_name}' updated: {log_message}", cur=g.cur)
+        delete_cache(f"task:{current_user}:{task_id}")
 
-        return jsonify({
+        return make_json_response(orjson.dumps({
             "msg": "Task edited successfully.",
             "task": task_response
-        }), 200
+        }))
     except TaskNotFoundError as e:
         return jsonify({"msg": str(e)}), 404
     except Exception as e:
@@ -995,37 +874,214 @@ def get_next_schedule():
     """
     current_user = get_jwt_identity()
 
+    cache_key = f"next_sched:user:{current_user}:rev:{get_user_cache_rev(current_user)}:json"
+    cached_payload = get_cache_raw(cache_key)
+    if cached_payload is not None:
+        return make_json_response(cached_payload)
+
     try:
-        g.cur.execute("""
-            SELECT start_time 
-            FROM scheduled_tasks 
-            WHERE user_id = %s AND is_enabled = TRUE 
-            ORDER BY start_time ASC 
-            LIMIT 1;
-        """, (current_user,))
-        result = g.cur.fetchone()
-
-        return jsonify({"next_schedule": result[0].isoformat() if result and result[0] else "N/A"}), 200
+        with db_connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute("""
+                    SELECT start_time 
+                    FROM scheduled_tasks 
+                    WHERE user_id = %s AND is_enabled = TRUE 
+                    ORDER BY start_time ASC 
+                    LIMIT 1;
+                """, (current_user,))
+                result = cur.fetchone()
+
+        payload = orjson.dumps({"next_schedule": result[0].isoformat() if result and result[0] else "N/A"})
+        set_cache_raw(cache_key, payload, expiry=30)
+        return make_json_response(payload)
     except Exception as e:
         logger.error(f"Error fetching next schedule: {str(e)}")
         return jsonify({"msg": "Error fetching next schedule."}), 500
 
 # --- Helper Functions ---
 
-def log_task_event(task_id, user_id, log_message):
+def run_scheduled_task_job(task_id, user_id, task_name, scraping_task_id, start_time, tender_type, scraping_function,
+                           search_terms, search_engines, time_frame, file_type, selected_region,
+                           email_notifications_enabled, custom_emails):
     """
-    Log a task event to the database.
+    Execute a manually started scheduled task on the scheduler's executor.
+    
+    Progress and errors are reported over Socket.IO under ``scraping_task_id``.
     
     Args:
         task_id (int): The ID of the task.
         user_id (str): The ID of the user.
-        log_message (str): The log message.
+        task_name (str): The name of the task.
+        scraping_task_id (str): The ID used for task state and Socket.IO updates.
+        start_time (str): The ISO start time of the run.
+        tender_type (str): The type of tender.
+        scraping_function (callable): The scraping function to run, if any.
+        search_terms (list): List of search terms.
+        search_engines (list): List of search engines.
+        time_frame (str): The search time frame.
+        file_type (str): The file type filter.
+        selected_region (str): The region filter.
+        email_notifications_enabled (bool): Whether to email open tenders.
+        custom_emails (str): Comma-separated recipient emails.
     """
+    conn = get_db_connection()
+    tenders = []
     try:
-        created_at = datetime.now().isoformat()
-        g.cur.execute("INSERT INTO task_logs (task_id, user_id, log_entry, created_at) VALUES (%s, %s, %s, %s)",
-                    (task_id, user_id, log_message, created_at))
-        delete_cache(f"task_logs:user:{user_id}:task:{task_id}")
-        delete_cache(f"all_task_logs:user:{user_id}")
+        if tender_type == 'Search Query Tenders':
+            from webapp.scrapers.run_query_scraper import scrape_tenders_from_query
+            query = ' '.join(search_terms) if search_terms else ''
+            if not query or not search_engines:
+                logger.warning(f"Cannot run Search Query Tenders task {task_id}: Missing search terms or engines")
+                socketio.emit('scrape_update', {
+                    'taskId': scraping_task_id,
+                    'status': 'error',
+                    'startTime': start_time,
+                    'message': "Missing search terms or engines."
+                }, namespace='/scraping')
+                add_notification(
+                    user_id,
+                    f"Task '{task_name}' failed to run: Missing search terms or engines."
+                )
+                return
+            logger.info(f"Starting manual scraping task for task_id {task_id} with scraping_task_id: {scraping_task_id}, query: {query}, engines: {search_engines}")
+            tenders = scrape_tenders_from_query(conn, query, search_engines, scraping_task_id)
+        else:
+            logger.info(f"Starting manual scraping task for task_id {task_id} with scraping_task_id: {scraping_task_id}, tender_type: {tender_type}")
+            if scraping_function in SOCKETIO_SCRAPERS:
+                scraping_function(
+                    scraping_task_id=scraping_task_id,
+                    set_task_state=set_task_state,
+                    socketio=socketio
+                )
+                task_state = get_task_state(scraping_task_id)
+                tenders = task_state.get("tenders", []) if task_state else []
+            else:
+                scraping_function(
+                    selected_engines=search_engines,
+                    time_frame=time_frame,
+                    file_type=file_type,
+                    region=selected_region,
+                    terms=search_terms
+                )
+
+        open_tenders_count = sum(1 for t in tenders if t.get('status') == 'open')
+        if email_notifications_enabled and tenders:
+            logger.info(f"Email notifications enabled for task {task_id}. Sending notifications to: {custom_emails}")
+            recipient_emails = custom_emails if custom_emails else DEFAULT_RECIPIENT_EMAIL
+            email_executor.submit(notify_open_tenders, tenders, task_id, recipient_emails=recipient_emails)
+            if open_tenders_count > 0:
+                add_notification(
+                    user_id,
+                    f"Task '{task_name}' found {open_tenders_count} new open tender(s)."
+                )
+
+        # Log final tender count
+        task_state = get_task_state(scraping_task_id)
+        expired_tenders_count = task_state.get('summary', {}).get('closedTenders', 0) if task_state else 0
+        total_tenders_count = task_state.get('summary', {}).get('totalTenders', 0) if task_state else 0
+        logger.info(f"Scraping completed for task {task_id} (scraping_task_id: {scraping_task_id}). Total tenders found: {total_tenders_count}, Open: {open_tenders_count}, Expired: {expired_tenders_count}")
+
     except Exception as e:
-        logger.error(f"Error logging task event for task_id {task_id}: {str(e)}")
\ No newline at end of file
+        logger.error(f"Error in background scraping task for task_id {task_id} (scraping_task_id: {scraping_task_id}): {str(e)}")
+        socketio.emit('scrape_update', {
+            'taskId': scraping_task_id,
+            'status': 'error',
+            'startTime': start_time,
+            'message': f"Error: {str(e)}"
+        }, namespace='/scraping')
+        add_notification(
+            user_id,
+            f"Task '{task_name}' failed to run: {str(e)}"
+        )
+    finally:
+        close_db_connection(conn)
+
+def run_task_job(task_id, user_id, task_name, tender_type, scraping_function, search_terms, selected_engines,
+                 time_frame, file_type, selected_region, email_notifications_enabled, custom_emails):
+    """
+    Execute a queued task run on the scheduler's executor.
+    
+    ``job_listener`` records ``last_run`` when this job completes and notifies the user if it raises.
+    
+    Args:
+        task_id (int): The ID of the task.
+        user_id (str): The ID of the user.
+        task_name (str): The name of the task.
+        tender_type (str): The type of tender.
+        scraping_function (callable): The scraping function to run.
+        search_terms (list): List of search terms.
+        selected_engines (list): List of search engines.
+        time_frame (str): The search time frame.
+        file_type (str): The file type filter.
+        selected_region (str): The region filter.
+        email_notifications_enabled (bool): Whether to email open tenders.
+        custom_emails (str): Comma-separated recipient emails.
+    """
+    logger.info(f"Running task '{task_name}' with search terms: {search_terms}.")
+    tenders = []
+    if scraping_function in SOCKETIO_SCRAPERS:
+        scraping_function()
+    elif tender_type == 'Search Query Tenders':
+        from webapp.scrapers.run_query_scraper import scrape_tenders_from_query
+        db_connection = get_db_connection()
+        try:
+            tenders = scrape_tenders_from_query(db_connection, ' '.join(search_terms), selected_engines, task_id)
+        finally:
+            close_db_connection(db_connection)
+    else:
+        scraping_function(selected_engines=selected_engines, time_frame=time_frame, file_type=file_type,
+                          region=selected_region, terms=search_terms)
+
+    if email_notifications_enabled and tenders:
+        logger.info(f"Email notifications enabled for task {task_id}. Sending notifications to: {custom_emails}")
+        recipient_emails = custom_emails if custom_emails else DEFAULT_RECIPIENT_EMAIL
+        email_executor.submit(notify_open_tenders, tenders, task_id, recipient_emails=recipient_emails)
+        open_tenders_count = sum(1 for t in tenders if t.get('status') == 'open')
+        if open_tenders_count > 0:
+            add_notification(
+                user_id,
+                f"Task '{task_name}' found {open_tenders_count} new open tender(s)."
+            )
+
+def log_task_event(task_id, user_id, log_message):
+    """
+    Queue a task event for the request's task_logs batch insert.
+    
+    The user's task list and task log caches are invalidated once the request commits.
+    
+    Args:
+        task_id (int): The ID of the task.
+        user_id (str): The ID of the user.
+        log_message (str): The log message.
+    """
+    g.setdefault('pending_logs', []).append((task_id, user_id, log_message, datetime.now(timezone.utc)))
+    mark_cache_stale(user_id)
+
+def mark_cache_stale(user_id):
+    """
+    Queue a cache generation bump for the user, applied after the request's commit.
+
+    Bumping before the commit lets a concurrent read re-cache the old rows under the new generation.
+    """
+    g.setdefault('stale_cache_users', set()).add(user_id)
+
+def bump_stale_cache_revs():
+    """
+    Bump the cache generation of every user marked stale during the request; call after committing.
+    """
+    for user_id in g.pop('stale_cache_users', ()):
+        bump_user_cache_rev(user_id)
+
+def flush_task_logs():
+    """
+    Insert the request's queued task events in one batch on the request cursor; the caller commits.
+    """
+    pending_logs = g.pop('pending_logs', None)
+    if not pending_logs:
+        return
+    execute_values(
+        g.cur,
+        "INSERT INTO task_logs (task_id, user_id, log_entry, created_at) VALUES %s",
+        pending_logs,
+        page_size=500
+    )
\ No newline at end of file
@@ -1,14 +1,21 @@
 import logging
+import re
 import uuid
 from datetime import datetime
-from webapp.config import get_db_connection, close_db_connection
-from .utils import set_task_state, get_search_terms
+from apscheduler.events import EVENT_JOB_ERROR, EVENT_JOB_EXECUTED, EVENT_JOB_MISSED
+from apscheduler.triggers.interval import IntervalTrigger
+from webapp.config import get_db_connection, close_db_connection, db_connection
+from webapp.extensions import socketio
+from .utils import set_task_state, get_task_state, stamp_last_run
 from .notifications import add_notification
-from .constants import TRIGGER_ARGS
+from .constants import FREQUENCY_INTERVALS, TRIGGER_ARGS
 from .exceptions import InvalidConfigurationError, UnsupportedFrequencyError
 
 logger = logging.getLogger(__name__)
 
+# Scheduled job IDs, optionally wrapped as a manual run: run_user_{uid}_task_{tid}_{hex}
+_JOB_ID_RE = re.compile(r'^(?P<run>run_)?user_(?P<uid>.+)_task_(?P<tid>\d+)(?(run)_[0-9a-f]+)$')
+
 def generate_job_id(user_id, task_id):
     """
     Generate a unique job ID for a scheduled task.
@@ -22,10 +29,57 @@ def generate_job_id(user_id, task_id):
     """
     return f"user_{user_id}_task_{task_id}"
 
+def run_search_query_job(socketio, user_id, task_id, job_function, search_terms, search_engines):
+    """
+    Run a scheduled Search Query Tenders scrape.
+    
+    Args:
+        socketio: The Socket.IO instance.
+        user_id (str): The ID of the user.
+        task_id (int): The ID of the task.
+        job_function (callable): The query scraping function.
+        search_terms (list): List of search terms.
+        search_engines (list): List of search engines.
+    """
+    scraping_task_id = str(uuid.uuid4())
+    start_time = datetime.now().isoformat()
+    conn = get_db_connection()
+    try:
+        query = ' '.join(search_terms)
+        logger.info(f"Running scheduled Search Query Tenders task {task_id} (scraping_task_id: {scraping_task_id}) with query: {query}, engines: {search_engines}")
+        set_task_state(scraping_task_id, {
+            "status": "running",
+            "startTime": start_time,
+            "cancel": False,
+            "tenders": [],
+            "visited_urls": [],
+            "total_urls": 0,
+            "summary": {}
+        })
+        socketio.emit('scrape_update', {
+            'taskId': scraping_task_id,
+            'status': 'running',
+            'startTime': start_time
+        }, namespace='/scraping')
+        job_function(conn, query, search_engines, scraping_task_id)
+    except Exception as e:
+        logger.error(f"Error in scheduled task {task_id} (scraping_task_id: {scraping_task_id}): {str(e)}")
+        socketio.emit('scrape_update', {
+            'taskId': scraping_task_id,
+            'status': 'error',
+            'startTime': start_time
+        }, namespace='/scraping')
+        add_notification(user_id, f"Scheduled task '{task_id}' failed to run: {str(e)}")
+    finally:
+        close_db_connection(conn)
+
 def schedule_task_scrape(scheduler, socketio, user_id, task_id, job_function, frequency, tender_type=None, search_terms=None, search_engines=None):
     """
     Schedule a scraping task with APScheduler.
     
+    An existing job with the same function, arguments and interval is left untouched; if only the
+    interval changed it is rescheduled in place rather than removed and re-added.
+    
     Args:
         scheduler: The APScheduler instance.
         socketio: The Socket.IO instance.
@@ -38,97 +92,130 @@ def schedule_task_scrape(scheduler, socketio, user_id, task_id, job_function, fr
         search_engines (list, optional): List of search engines.
     """
     job_id = generate_job_id(user_id, task_id)
-    existing_job = scheduler.get_job(job_id)
-    if existing_job:
-        scheduler.remove_job(job_id)
 
     if frequency not in TRIGGER_ARGS:
         logger.warning(f'Unsupported frequency: {frequency}')
         raise UnsupportedFrequencyError(f"Unsupported frequency: {frequency}")
 
     if tender_type == 'Search Query Tenders' and (search_terms is None or search_engines is None):
-        conn = get_db_connection()
-        cur = conn.cursor()
-        try:
+        with db_connection() as conn, conn.cursor() as cur:
             cur.execute("""
-                SELECT task_id, name, frequency, start_time, end_time, priority, is_enabled, tender_type, last_run, search_engines
+                SELECT search_engines,
+                       ARRAY(SELECT term FROM task_search_terms WHERE task_search_terms.task_id = scheduled_tasks.task_id)
                 FROM scheduled_tasks
                 WHERE task_id = %s AND user_id = %s
             """, (task_id, user_id))
             task = cur.fetchone()
 
-            if not task:
-                logger.error(f"Task {task_id} not found for user {user_id}")
-                return
+        if not task:
+            logger.error(f"Task {task_id} not found for user {user_id}")
+            return
 
-            # Call get_search_terms with the cursor explicitly
-            cur.execute("SELECT term FROM task_search_terms WHERE task_id = %s", (task_id,))
-            db_search_terms = [row[0] for row in cur.fetchall()]
-            search_terms = search_terms if search_terms is not None else db_search_terms
-            search_engines = search_engines if search_engines is not None else (task[9].split(',') if task[9] else [])
-
-        finally:
-            cur.close()
-            close_db_connection(conn)
+        db_search_engines, db_search_terms = task
+        search_terms = search_terms if search_terms is not None else db_search_terms
+        search_engines = search_engines if search_engines is not None else (db_search_engines or [])
 
     if tender_type == 'Search Query Tenders' and job_function.__name__ == 'scrape_tenders_from_query':
         if not search_terms or not search_engines:
             logger.warning(f"Cannot schedule Search Query Tenders task {task_id}: Missing search terms or engines")
             raise InvalidConfigurationError("Missing search terms or engines for Search Query Tenders")
+        func = run_search_query_job
+        args = [socketio, user_id, task_id, job_function, search_terms, search_engines]
+    else:
+        func = job_function
+        args = []
 
-        def job_wrapper():
-            scraping_task_id = str(uuid.uuid4())
-            start_time = datetime.now().isoformat()
-            db_connection = get_db_connection()
-            try:
-                query = ' '.join(search_terms)
-                logger.info(f"Running scheduled Search Query Tenders task {task_id} (scraping_task_id: {scraping_task_id}) with query: {query}, engines: {search_engines}")
-                set_task_state(scraping_task_id, {
-                    "status": "running",
-                    "startTime": start_time,
-                    "cancel": False,
-                    "tenders": [],
-                    "visited_urls": [],
-                    "total_urls": 0,
-                    "summary": {}
-                })
-                socketio.emit('scrape_update', {
-                    'taskId': scraping_task_id,
-                    'status': 'running',
-                    'startTime': start_time
-                }, namespace='/scraping')
-                job_function(db_connection, query, search_engines, scraping_task_id)
-            except Exception as e:
-                logger.error(f"Error in scheduled task {task_id} (scraping_task_id: {scraping_task_id}): {str(e)}")
-                socketio.emit('scrape_update', {
-                    'taskId': scraping_task_id,
-                    'status': 'error',
-                    'startTime': start_time
-                }, namespace='/scraping')
-                add_notification(user_id, f"Scheduled task '{task_id}' failed to run: {str(e)}")
-            finally:
-                close_db_connection(db_connection)
-
-        scheduler.add_job(job_wrapper, 'interval', id=job_id, **TRIGGER_ARGS[frequency])
+    existing_job = scheduler.get_job(job_id)
+    if existing_job and existing_job.func is func and list(existing_job.args) == args:
+        if getattr(existing_job.trigger, 'interval', None) == FREQUENCY_INTERVALS[frequency]:
+            logger.debug(f'Job {job_id} already scheduled with frequency {frequency}, skipping.')
+            return
+        scheduler.reschedule_job(job_id, trigger=IntervalTrigger(**TRIGGER_ARGS[frequency]))
+        logger.info(f'Rescheduled job: {job_id} to {frequency}')
+        return
+
+    # A fresh trigger per job keeps each job's first run one interval after it is added;
+    # building it here skips APScheduler's alias lookup and kwargs parsing in add_job
+    scheduler.add_job(func, IntervalTrigger(**TRIGGER_ARGS[frequency]), id=job_id, args=args, replace_existing=True)
+    if func is run_search_query_job:
         logger.info(f'Scheduled Search Query Tenders job: {job_id} with query: {" ".join(search_terms)}')
     else:
-        scheduler.add_job(job_function, 'interval', id=job_id, **TRIGGER_ARGS[frequency])
         logger.info(f'Scheduled job: {job_id}')
 
+def record_last_run(task_id, user_id):
+    """
+    Record the completion time of a task run.
+    
+    Args:
+        task_id (int): The ID of the task.
+        user_id (str): The ID of the task's owner.
+    """
+    try:
+        with db_connection() as conn, conn.cursor() as cur:
+            stamp_last_run(cur, task_id, user_id)
+    except Exception as e:
+        logger.error(f"Error recording last_run for task_id {task_id}: {str(e)}")
+
+def report_missed_run(state_id, message):
+    """
+    Mark a manual run that never started as failed and tell the client.
+    
+    Args:
+        state_id (str): The task-state and Socket.IO ID of the run.
+        message (str): The error message to report.
+    """
+    task_state = get_task_state(state_id) or {}
+    start_time = task_state.get("startTime", datetime.now().isoformat())
+    set_task_state(state_id, {
+        "status": "error",
+        "startTime": start_time,
+        "cancel": False,
+        "tenders": [],
+        "visited_urls": [],
+        "total_urls": 0,
+        "summary": {}
+    })
+    socketio.emit('scrape_update', {
+        'taskId': state_id,
+        'status': 'error',
+        'startTime': start_time,
+        'message': message
+    }, namespace='/scraping')
+
 def job_listener(event):
     """
     Listener for APScheduler job events.
     
+    Manual runs are queued with a ``run_`` or ``manual_`` prefixed job ID; their ``last_run`` is
+    recorded on success, and a run that misses its start window is reported as failed.
+    
     Args:
         event: The APScheduler event.
     """
+    if event.code == EVENT_JOB_MISSED and event.job_id.startswith('manual_'):
+        logger.error('Manual job %s missed its start window.', event.job_id)
+        report_missed_run(event.job_id[len('manual_'):], "Scraping could not start: the scheduler was too busy. Please try again.")
+        return
+
+    match = _JOB_ID_RE.match(event.job_id)
+    if not match:
+        return
+
+    user_id, task_id = match['uid'], match['tid']
+    is_manual_run = match['run'] is not None
+    if event.code == EVENT_JOB_MISSED:
+        if is_manual_run:
+            logger.error('Manual job %s missed its start window.', event.job_id)
+            report_missed_run(event.job_id, "Task run could not start: the scheduler was too busy. Please try again.")
+            add_notification(user_id, f"Task '{task_id}' failed to run: the scheduler was too busy to start it.")
+        return
     if event.exception:
         logger.error('Job %s failed: %s', event.job_id, event.exception)
-        user_id = event.job_id.split('_')[1]
-        task_id = event.job_id.split('_')[3]
         add_notification(user_id, f"Scheduled job for task '{task_id}' failed: {str(event.exception)}")
     else:
         logger.info('Job %s completed successfully.', event.job_id)
+        if is_manual_run:
+            record_last_run(task_id, user_id)
 
 def setup_scheduler(scheduler):
     """
@@ -138,6 +225,8 @@ def setup_scheduler(scheduler):
         scheduler: The APScheduler instance.
     """
     from webapp.services.delete_expired_tenders import delete_expired_tenders
+    from webapp.services.delete_old_task_logs import delete_old_task_logs
+    scheduler.add_listener(job_listener, EVENT_JOB_EXECUTED | EVENT_JOB_ERROR | EVENT_JOB_MISSED)
     scheduler.add_job(
         delete_expired_tenders,
         trigger='cron',
@@ -145,4 +234,12 @@ def setup_scheduler(scheduler):
         minute=0,
         id='delete_expired_tenders',
         replace_existing=True
+    )
+    scheduler.add_job(
+        delete_old_task_logs,
+        trigger='cron',
+        hour=0,
+        minute=30,
+        id='delete_old_task_logs',
+        replace_existing=True
     )
\ No newline at end of file
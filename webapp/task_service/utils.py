@@ -1,30 +1,56 @@
-import json
 import logging
+import orjson
+import re
+import threading
+import time
+import weakref
+from cachetools import TTLCache
+from collections import namedtuple
 from datetime import datetime
 from dateutil import parser
-from flask import g
+from flask import Response, g
+from webapp.config import DB_SESSION_STATE
 from webapp.cache.redis_cache import redis_client, get_cache, set_cache, delete_cache
-from .constants import FREQUENCY_INTERVALS
+from .constants import FREQUENCY_INTERVAL_SECONDS
 from .exceptions import TaskNotFoundError
 
 logger = logging.getLogger(__name__)
 
+EMAIL_RE = re.compile(r'^[^\s@]+@[^\s@]+\.[^\s@]+$')
+
+# Raw task-state hashes keyed by task ID. Scrapers and socket handlers poll the same
+# task many times per second; a 100ms window collapses those reads into one HGETALL.
+_task_state_cache = TTLCache(maxsize=10000, ttl=0.1)
+_task_state_lock = threading.RLock()
+
 # --- Redis Utilities ---
 
 def set_task_state(task_id, state, expiry=3600):
     """
     Set the state of a scraping task in Redis with an expiration time.
     
+    The state is stored as a hash with one JSON-encoded value per field and replaces any
+    previous state atomically.
+    
     Args:
         task_id (str): The ID of the scraping task.
         state (dict): The state to set.
         expiry (int): Expiration time in seconds (default: 3600).
     """
     try:
-        existing_state = get_task_state(task_id) or {}
-        if "startTime" in existing_state and "startTime" not in state:
-            state["startTime"] = existing_state["startTime"]
-        redis_client.setex(f"scraping_task:{task_id}", expiry, json.dumps(state))
+        key = f"scraping_task:{task_id}"
+        if "startTime" not in state:
+            existing_start_time = redis_client.hget(key, "startTime")
+            if existing_start_time is not None:
+                state["startTime"] = orjson.loads(existing_start_time)
+        pipe = redis_client.pipeline()
+        pipe.delete(key)
+        if state:
+            pipe.hset(key, mapping={field: orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS) for field, value in state.items()})
+        pipe.expire(key, expiry)
+        pipe.execute()
+        with _task_state_lock:
+            _task_state_cache.pop(str(task_id), None)
     except Exception as e:
         logger.error(f"Error setting task state in Redis for task_id {task_id}: {str(e)}")
 
@@ -32,6 +58,9 @@ def get_task_state(task_id):
     """
     Retrieve the state of a scraping task from Redis.
     
+    Reads are served from a short-lived in-process cache of the raw hash; values are
+    decoded on every call so callers never share mutable state.
+    
     Args:
         task_id (str): The ID of the scraping task.
     
@@ -39,8 +68,13 @@ def get_task_state(task_id):
         dict: The task state, or None if not found.
     """
     try:
-        state = redis_client.get(f"scraping_task:{task_id}")
-        return json.loads(state) if state else None
+        with _task_state_lock:
+            fields = _task_state_cache.get(str(task_id))
+        if fields is None:
+            fields = redis_client.hgetall(f"scraping_task:{task_id}")
+            with _task_state_lock:
+                _task_state_cache[str(task_id)] = fields
+        return {field: orjson.loads(value) for field, value in fields.items()} if fields else None
     except Exception as e:
         logger.error(f"Error getting task state from Redis for task_id {task_id}: {str(e)}")
         return None
@@ -54,9 +88,50 @@ def delete_task_state(task_id):
     """
     try:
         redis_client.delete(f"scraping_task:{task_id}")
+        with _task_state_lock:
+            _task_state_cache.pop(str(task_id), None)
     except Exception as e:
         logger.error(f"Error deleting task state from Redis for task_id {task_id}: {str(e)}")
 
+def get_user_cache_rev(user_id):
+    """
+    Get the current cache generation for a user's task list and task log caches.
+    
+    Cache keys embed this value, so bumping it invalidates every one of those keys at once;
+    entries under older generations simply expire through their TTL.
+    
+    Args:
+        user_id (str): The ID of the user.
+    
+    Returns:
+        str: The user's cache generation, or None if Redis is unavailable.
+    """
+    key = f"rev:user:{user_id}"
+    try:
+        rev = redis_client.get(key)
+        if rev is None:
+            # Seed from the clock so a lost counter never reuses an earlier generation
+            redis_client.set(key, int(time.time() * 1000), nx=True)
+            rev = redis_client.get(key)
+        return rev
+    except Exception as e:
+        logger.error(f"Error getting cache generation from Redis for user_id {user_id}: {str(e)}")
+        return None
+
+def bump_user_cache_rev(user_id):
+    """
+    Invalidate a user's task list and task log caches by advancing their cache generation.
+    
+    Args:
+        user_id (str): The ID of the user.
+    """
+    key = f"rev:user:{user_id}"
+    try:
+        if redis_client.incr(key) == 1:
+            redis_client.set(key, int(time.time() * 1000))
+    except Exception as e:
+        logger.error(f"Error bumping cache generation in Redis for user_id {user_id}: {str(e)}")
+
 # --- Database Utilities ---
 
 def fetch_task_details(task_id, user_id, fields="*"):
@@ -94,21 +169,155 @@ def get_search_terms(task_id):
     g.cur.execute("SELECT term FROM task_search_terms WHERE task_id = %s", (task_id,))
     return [row[0] for row in g.cur.fetchall()]
 
+# Connections that already hold the update_last_run prepared statement
+_last_run_prepared = weakref.WeakSet()
+
+def stamp_last_run(cur, task_id, user_id):
+    """
+    Stamp a task's last_run with the current time through a per-connection prepared statement.
+    
+    Prepared statements outlive transactions, so pooled connections prepare it once and reuse it.
+    Behind the transaction-mode pooler the session is not stable, so a plain UPDATE is sent instead.
+    
+    Args:
+        cur: The cursor to execute on.
+        task_id (int): The ID of the task.
+        user_id (str): The ID of the task's owner.
+    
+    Returns:
+        int: The number of rows updated.
+    """
+    if not DB_SESSION_STATE:
+        cur.execute("UPDATE scheduled_tasks SET last_run = now() WHERE task_id = %s AND user_id = %s", (task_id, user_id))
+        return cur.rowcount
+    if cur.connection not in _last_run_prepared:
+        cur.execute("""
+            PREPARE update_last_run AS
+            UPDATE scheduled_tasks SET last_run = now() WHERE task_id = $1 AND user_id = $2
+        """)
+        _last_run_prepared.add(cur.connection)
+    cur.execute("EXECUTE update_last_run (%s, %s)", (task_id, user_id))
+    return cur.rowcount
+
+def fetch_task_with_search_terms(task_id, user_id, fields, update_last_run=False):
+    """
+    Fetch task details and the task's search terms in a single query.
+    
+    Args:
+        task_id (int): The ID of the task.
+        user_id (str): The ID of the user.
+        fields (str): The scheduled_tasks fields to select.
+        update_last_run (bool): Stamp last_run with the current time in the same statement.
+    
+    Returns:
+        tuple: The task details and the list of search terms.
+    
+    Raises:
+        TaskNotFoundError: If the task is not found or the user lacks permission.
+    """
+    search_terms_query = "ARRAY(SELECT term FROM task_search_terms WHERE task_search_terms.task_id = scheduled_tasks.task_id)"
+    if update_last_run:
+        g.cur.execute(f"""
+            UPDATE scheduled_tasks SET last_run = now()
+            WHERE task_id = %s AND user_id = %s
+            RETURNING {fields}, {search_terms_query}
+        """, (task_id, user_id))
+    else:
+        g.cur.execute(f"""
+            SELECT {fields}, {search_terms_query}
+            FROM scheduled_tasks
+            WHERE task_id = %s AND user_id = %s
+        """, (task_id, user_id))
+    row = g.cur.fetchone()
+    if not row:
+        logger.warning(f"Task {task_id} not found for user {user_id}")
+        raise TaskNotFoundError("Task not found or access denied.")
+    return row[:-1], row[-1]
+
+# Row returned by get_task_bundle; the field order doubles as the selected column list
+TaskBundle = namedtuple('TaskBundle', [
+    'user_id', 'name', 'tender_type', 'frequency', 'search_engines', 'time_frame', 'file_type',
+    'selected_region', 'email_notifications_enabled', 'custom_emails'
+])
+TASK_BUNDLE_FIELDS = ", ".join(TaskBundle._fields)
+
+def get_task_bundle(task_id, user_id, update_last_run=False):
+    """
+    Fetch a task's run configuration and search terms, cached in Redis for 60 seconds.
+    
+    With update_last_run, last_run is stamped by the same statement that loads the task on a
+    cache miss, or by a single UPDATE on a cache hit.
+    
+    Args:
+        task_id (int): The ID of the task.
+        user_id (str): The ID of the user.
+        update_last_run (bool): Also set the task's last_run to the current time.
+    
+    Returns:
+        tuple: The task details as a TaskBundle and the list of search terms.
+    
+    Raises:
+        TaskNotFoundError: If the task is not found or the user lacks permission.
+    """
+    cache_key = f"task:{user_id}:{task_id}"
+    cached_bundle = get_cache(cache_key)
+    if cached_bundle is not None:
+        if update_last_run:
+            if stamp_last_run(g.cur, task_id, user_id) == 0:
+                delete_cache(cache_key)
+                raise TaskNotFoundError("Task not found or access denied.")
+        return TaskBundle(*cached_bundle["task"]), cached_bundle["search_terms"]
+
+    task, search_terms = fetch_task_with_search_terms(task_id, user_id, TASK_BUNDLE_FIELDS, update_last_run)
+    set_cache(cache_key, {"task": list(task), "search_terms": search_terms}, expiry=60)
+    return TaskBundle(*task), search_terms
+
 # --- Task Utilities ---
 
-def format_task_response(task, search_terms=None, calculate_next=True):
+def make_json_response(data, status=200):
     """
-    Format a task response for API output.
+    Wrap an already serialized JSON payload in a response without re-encoding it.
     
     Args:
-        task (tuple): The task data from the database.
-        search_terms (list, optional): List of search terms.
-        calculate_next (bool): Whether to calculate the next schedule (default: True).
+        data (bytes or str): The serialized JSON body.
+        status (int): The HTTP status code (default: 200).
     
     Returns:
-        dict: Formatted task response.
+        Response: The JSON response.
     """
-    task_dict = {
+    return Response(data, status=status, mimetype='application/json')
+
+def parse_and_validate_emails(custom_emails):
+    """
+    Normalize a custom email list in one pass, splitting out invalid addresses.
+    
+    Args:
+        custom_emails (str or list): Comma-separated emails or a list of emails.
+    
+    Returns:
+        tuple: The comma-joined valid emails and the list of invalid emails.
+    """
+    if isinstance(custom_emails, str):
+        custom_emails = custom_emails.split(",")
+    elif not isinstance(custom_emails, list):
+        return "", []
+
+    valid, invalid = [], []
+    for email in custom_emails:
+        email = email.strip()
+        if not email:
+            continue
+        if EMAIL_RE.match(email):
+            valid.append(email)
+        else:
+            invalid.append(email)
+    return ",".join(valid), invalid
+
+def _split_engines(engines):
+    return engines if isinstance(engines, list) else (engines.split(',') if engines else [])
+
+def _format_full(task, search_terms):
+    return {
         "task_id": task[0],
         "name": task[1],
         "frequency": task[2],
@@ -118,17 +327,97 @@ def format_task_response(task, search_terms=None, calculate_next=True):
         "is_enabled": task[6],
         "tender_type": task[7],
         "last_run": task[8].isoformat() if task[8] else None,
-        "email_notifications_enabled": task[9] if len(task) > 9 else False,
-        "sms_notifications_enabled": task[10] if len(task) > 10 else False,
-        "slack_notifications_enabled": task[11] if len(task) > 11 else False,
-        "custom_emails": task[12] if len(task) > 12 else "",
-        "search_terms": search_terms if search_terms is not None else (task[13] if len(task) > 13 and task[13] else []),
-        "engines": task[14] if isinstance(task[14], list) else (task[14].split(',') if task[14] else []),
+        "email_notifications_enabled": task[9],
+        "sms_notifications_enabled": task[10],
+        "slack_notifications_enabled": task[11],
+        "custom_emails": task[12],
+        "search_terms": search_terms if search_terms is not None else (task[13] or []),
+        "engines": _split_engines(task[14]),
     }
+
+def _format_short(task, search_terms):
+    return {
+        "task_id": task[0],
+        "name": task[1],
+        "frequency": task[2],
+        "start_time": task[3].isoformat() if task[3] else None,
+        "end_time": task[4].isoformat() if task[4] else None,
+        "priority": task[5],
+        "is_enabled": task[6],
+        "tender_type": task[7],
+        "last_run": task[8].isoformat() if task[8] else None,
+        "email_notifications_enabled": False,
+        "sms_notifications_enabled": False,
+        "slack_notifications_enabled": False,
+        "custom_emails": "",
+        "search_terms": search_terms if search_terms is not None else [],
+        "engines": [],
+    }
+
+def format_task_response(task, search_terms=None, calculate_next=True):
+    """
+    Format a task response for API output.
+    
+    Rows carry either the nine core columns or the full fifteen (notification settings,
+    search terms and engines); the shape is resolved once and the missing columns default.
+    
+    Args:
+        task (tuple): The task data from the database.
+        search_terms (list, optional): List of search terms.
+        calculate_next (bool): Whether to calculate the next schedule (default: True).
+    
+    Returns:
+        dict: Formatted task response.
+    """
+    fmt = _format_full if len(task) >= 15 else _format_short
+    task_dict = fmt(task, search_terms)
     if calculate_next:
         task_dict["next_schedule"] = calculate_next_schedule(task[3], task[2], task[6])
     return task_dict
 
+def format_task_record(record, calculate_next=True):
+    """
+    Format a task row fetched with a ``RealDictCursor`` for API output.
+    
+    Timestamps are left as datetimes; the response is serialized with orjson, which emits ISO 8601.
+    
+    Args:
+        record (dict): The task row keyed by column name.
+        calculate_next (bool): Whether to calculate the next schedule (default: True).
+    
+    Returns:
+        dict: Formatted task response.
+    """
+    task_dict = dict(
+        record,
+        search_terms=record['search_terms'] or [],
+        engines=_split_engines(record['engines']),
+    )
+    if calculate_next:
+        task_dict["next_schedule"] = calculate_next_schedule(record['start_time'], record['frequency'], record['is_enabled'])
+    return task_dict
+
+def parse_iso_datetime(value):
+    """
+    Parse an ISO 8601 timestamp, falling back to dateutil for anything fromisoformat rejects.
+    
+    Args:
+        value (str): The timestamp string.
+    
+    Returns:
+        datetime: The parsed timestamp.
+    
+    Raises:
+        TypeError: If value is not a string.
+        ValueError: If value cannot be parsed.
+    """
+    if not isinstance(value, str):
+        raise TypeError(f"Expected an ISO timestamp string, got {type(value).__name__}")
+    try:
+        return datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except ValueError:
+        return parser.parse(value)
+
 def calculate_next_schedule(start_time, frequency, is_enabled):
     """
     Calculate the next scheduled time for a task based on its frequency.
@@ -141,17 +430,14 @@ def calculate_next_schedule(start_time, frequency, is_enabled):
     Returns:
         str: The next scheduled time in ISO format, or "N/A" if not applicable.
     """
-    logger.info(f"Calculating next schedule: start_time={start_time}, frequency={frequency}, is_enabled={is_enabled}")
+    logger.debug("Calculating next schedule: start_time=%s, frequency=%s, is_enabled=%s", start_time, frequency, is_enabled)
     
     if not is_enabled or not start_time:
-        logger.info(f"Returning 'N/A' because is_enabled={is_enabled}, start_time={start_time}")
         return "N/A"
 
-    now = datetime.now()
-
     if isinstance(start_time, str):
         try:
-            start = parser.parse(start_time)
+            start = parse_iso_datetime(start_time)
         except ValueError as e:
             logger.error(f"Failed to parse start_time '{start_time}': {str(e)}")
             return "N/A"
@@ -159,22 +445,18 @@ def calculate_next_schedule(start_time, frequency, is_enabled):
         start = start_time
 
     frequency = frequency.strip().title()
-    logger.info(f"Normalized frequency: '{frequency}'")
 
-    interval = FREQUENCY_INTERVALS.get(frequency)
-    if not interval:
+    step = FREQUENCY_INTERVAL_SECONDS.get(frequency)
+    if not step:
         logger.warning(f"Frequency '{frequency}' not found in intervals. Returning 'N/A'")
         return "N/A"
 
-    if start > now:
+    start_ts = start.timestamp()
+    now_ts = time.time()
+    if start_ts > now_ts:
         return start.isoformat()
 
-    time_diff = now - start
-    intervals_passed = int(time_diff.total_seconds() // interval.total_seconds()) + 1
-    next_schedule = start + (interval * intervals_passed)
-
-    while next_schedule < now:
-        next_schedule += interval
-
-    logger.info(f"Calculated next_schedule: {next_schedule.isoformat()}")
-    return next_schedule.isoformat()
\ No newline at end of file
+    intervals_passed = (now_ts - start_ts) // step + 1
+    next_schedule = datetime.fromtimestamp(start_ts + intervals_passed * step, start.tzinfo).isoformat()
+    logger.debug("Calculated next_schedule: %s", next_schedule)
+    return next_schedule
\ No newline at end of file
@@ -1,5 +1,8 @@
 # In app/utils/scraping_progress.py
 
+import logging
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from flask import request, jsonify
 from flask_socketio import SocketIO
 from flask_jwt_extended import jwt_required
@@ -12,31 +15,72 @@ from webapp.scrapers.jobinrwanda_tenders import jobinrwanda_tenders
 from webapp.scrapers.treasury_ke_tenders import treasury_ke_tenders
 from webapp.scrapers.website_scraper import scrape_tenders_from_websites
 
-def run_scraping_with_progress(socketio, tender_types):
-    scraping_functions = {
-        'CA Tenders': scrape_ungm_tenders,
-        'ReliefWeb Jobs': fetch_reliefweb_tenders,
-        'Job in Rwanda': jobinrwanda_tenders,
-        'Kenya Treasury': treasury_ke_tenders,
-        'UNDP': scrape_undp_tenders,
-        'PPIP': scrape_ppip_tenders,
-        'Website Tenders': scrape_tenders_from_websites,
-        'General Tenders': scrape_tenders,
-    }
+logger = logging.getLogger(__name__)
+
+# Scrapers are independent and network-bound; cap how many hit their targets at once
+MAX_CONCURRENT_SCRAPERS = 4
+
+# Seconds a scraper may run before it is abandoned, so one stalled target cannot hold back scan-complete
+DEFAULT_SCRAPER_TIMEOUT = 600
+SCRAPER_TIMEOUTS = {
+    'ReliefWeb Jobs': 120,
+}
+TIMEOUT_POLL_SECONDS = 5
 
+# Tender types that /run-scraping accepts, mapped to their scraping functions
+SCRAPERS = {
+    'CA Tenders': scrape_ungm_tenders,
+    'ReliefWeb Jobs': fetch_reliefweb_tenders,
+    'Job in Rwanda': jobinrwanda_tenders,
+    'Kenya Treasury': treasury_ke_tenders,
+    'UNDP': scrape_undp_tenders,
+    'PPIP': scrape_ppip_tenders,
+    'Website Tenders': scrape_tenders_from_websites,
+    'General Tenders': scrape_tenders,
+}
+
+def run_scraping_with_progress(socketio, tender_types):
+    # The route has already dropped duplicate and unknown tender types
     total_tasks = len(tender_types)
-    for i, tender_type in enumerate(tender_types):
-        function = scraping_functions.get(tender_type)
-        if function:
-            try:
-                function()  # Call the actual scraping function
-                print(f"{function.__name__} completed successfully.")
-            except Exception as e:
-                print(f"Error in {function.__name__}: {str(e)}")
-
-            # Calculate and emit progress
-            progress = int((i + 1) / total_tasks * 100)
-            socketio.emit('progress', {'progress': progress})  # Send progress to client
+    started = {}  # Timeouts count from when a scraper actually starts, not from when it was queued
+
+    def run(tender_type):
+        started[tender_type] = time.monotonic()
+        return SCRAPERS[tender_type]()
+
+    done = 0
+    executor = ThreadPoolExecutor(max_workers=MAX_CONCURRENT_SCRAPERS)
+    try:
+        pending = {executor.submit(run, tender_type): tender_type for tender_type in tender_types}
+        while pending:
+            finished, _ = wait(pending, timeout=TIMEOUT_POLL_SECONDS, return_when=FIRST_COMPLETED)
+            for future in finished:
+                function = SCRAPERS[pending.pop(future)]
+                try:
+                    future.result()
+                    logger.info(f"{function.__name__} completed successfully.")
+                except Exception:
+                    # Keep the scraper's traceback; result() re-raises it with the worker's frames
+                    logger.exception(f"Error in {function.__name__}")
+
+            now = time.monotonic()
+            timed_out = [
+                future for future, tender_type in pending.items()
+                if tender_type in started and now - started[tender_type] > SCRAPER_TIMEOUTS.get(tender_type, DEFAULT_SCRAPER_TIMEOUT)
+            ]
+            for future in timed_out:
+                tender_type = pending.pop(future)
+                future.cancel()  # Best effort; a running scraper is left to finish on its own
+                logger.error(f"{SCRAPERS[tender_type].__name__} timed out after {SCRAPER_TIMEOUTS.get(tender_type, DEFAULT_SCRAPER_TIMEOUT)}s")
+
+            if finished or timed_out:
+                # Scrapers that finished together are reported with a single emit from this thread
+                done += len(finished) + len(timed_out)
+                progress = int(done / total_tasks * 100)
+                socketio.emit('progress', {'progress': progress})  # Send progress to client
+    finally:
+        # Don't join abandoned scrapers; their threads exit when the scraper eventually returns
+        executor.shutdown(wait=False, cancel_futures=True)
 
     socketio.emit('scan-complete')  # Notify the client that the scan is complete
 
@@ -50,6 +94,12 @@ def register_scraping_routes(app, socketio):
         if not tender_types or not isinstance(tender_types, list):
             return jsonify({"error": "Please provide a valid list of tender types."}), 400
 
-        # Call the run_scraping_with_progress function with the current socketio instance
-        run_scraping_with_progress(socketio, tender_types)
+        # Drop repeats so a type is only scraped once, keeping the client's order
+        tender_types = list(dict.fromkeys(tender_types))
+        unknown_types = [t for t in tender_types if t not in SCRAPERS]
+        if unknown_types:
+            return jsonify({"error": "Unknown tender types.", "types": unknown_types}), 400
+
+        # Run in the background so the 202 goes out immediately; progress arrives over Socket.IO
+        socketio.start_background_task(run_scraping_with_progress, socketio, tender_types)
         return jsonify({"message": "Scraping started!"}), 202  # 202 indicates that the request has been accepted for processing
\ No newline at end of file